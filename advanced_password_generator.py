@@ -3,16 +3,31 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import hashlib
-import itertools
-from gmssl import sm3
 import threading
+import multiprocessing
 import os
 import re
 from file_decryptor import FileDecryptor
+from password_engine import (PasswordSpec, GenerationProgress, parse_option_text,
+                             generate_dictionary, CORE_TYPES, CORE_EMPTY,
+                             DATE_CORE_FORMATS)
+from date_tables import DEFAULT_YEAR_RANGE, parse_year_range
+from password_mask import CORE_MASK, mask_from_text
+from parallel_generator import generate_parallel
+from pipeline import generate_and_decrypt
+from candidate_order import (ORDER_LEXICOGRAPHIC, ORDER_FREQUENCY, ORDER_MARKOV, DEFAULT_TRAIN_WORDS,
+                             CharModel, apply_order)
+from rule_engine import RULE_PRESETS, RuleMangler, RuleSet, load_rule_file, mangle_dictionary, preset_rules
+from dict_io import DEFAULT_BUFFER_SIZE, COMPRESSION_EXTENSIONS, available_compressions
 from gpu_utils import get_gpu_status, detect_gpu
 
 class AdvancedPasswordGeneratorGUI:
+    # 界面轮询生成进度的周期（毫秒）
+    PROGRESS_POLL_MS = 100
+    
+    # 候选顺序选项
+    ORDER_LABELS = {"字典序": ORDER_LEXICOGRAPHIC, "位置频率": ORDER_FREQUENCY, "马尔可夫": ORDER_MARKOV}
+    
     def __init__(self, root):
         self.root = root
         self.root.title("高级密码生成器 - 完整版")
@@ -147,6 +162,47 @@ class AdvancedPasswordGeneratorGUI:
         ttk.Button(output_file_frame, text="浏览...", command=self.browse_output_file).pack(side=tk.LEFT, padx=(5, 0))
         ttk.Button(output_file_frame, text="选择字典...", command=self.browse_dict_for_output).pack(side=tk.LEFT, padx=(5, 0))
         
+        # 并行生成设置
+        parallel_frame = ttk.Frame(parent_frame)
+        parallel_frame.pack(pady=(0, 10))
+        
+        ttk.Label(parallel_frame, text="并行进程数:").pack(side=tk.LEFT, padx=(0, 5))
+        self.workers_var = tk.StringVar(value="1")
+        ttk.Entry(parallel_frame, textvariable=self.workers_var, width=6).pack(side=tk.LEFT, padx=(0, 10))
+        self.per_shard_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(parallel_frame, text="按分片输出文件", variable=self.per_shard_var).pack(side=tk.LEFT, padx=(0, 10))
+        self.resume_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(parallel_frame, text="断点续传", variable=self.resume_var).pack(side=tk.LEFT)
+        
+        buffer_frame = ttk.Frame(parent_frame)
+        buffer_frame.pack(pady=(0, 10))
+        
+        ttk.Label(buffer_frame, text="写入缓冲(MB):").pack(side=tk.LEFT, padx=(0, 5))
+        self.buffer_mb_var = tk.StringVar(value=str(DEFAULT_BUFFER_SIZE // (1024 * 1024)))
+        ttk.Entry(buffer_frame, textvariable=self.buffer_mb_var, width=6).pack(side=tk.LEFT, padx=(0, 10))
+        
+        ttk.Label(buffer_frame, text="压缩:").pack(side=tk.LEFT, padx=(0, 5))
+        self.compression_var = tk.StringVar(value="auto")
+        ttk.Combobox(buffer_frame, textvariable=self.compression_var, values=["auto"] + available_compressions(),
+                     state="readonly", width=6).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(buffer_frame, text="级别:").pack(side=tk.LEFT, padx=(0, 5))
+        self.compression_level_var = tk.StringVar(value="")
+        ttk.Entry(buffer_frame, textvariable=self.compression_level_var, width=4).pack(side=tk.LEFT)
+        
+        # 候选顺序：按参考字典训练的概率模型排序，常见密码更早出现
+        order_frame = ttk.Frame(parent_frame)
+        order_frame.pack(pady=(0, 10))
+        
+        ttk.Label(order_frame, text="候选顺序:").pack(side=tk.LEFT, padx=(0, 5))
+        self.order_var = tk.StringVar(value="字典序")
+        ttk.Combobox(order_frame, textvariable=self.order_var, values=list(self.ORDER_LABELS),
+                     state="readonly", width=8).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(order_frame, text="参考字典:").pack(side=tk.LEFT, padx=(0, 5))
+        self.train_dict_var = tk.StringVar()
+        ttk.Entry(order_frame, textvariable=self.train_dict_var, width=14).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(order_frame, text="浏览...", command=self.browse_train_dict).pack(side=tk.LEFT)
+        self._order_model_cache = None
+        
         # 分隔线
         ttk.Separator(parent_frame, orient='horizontal').pack(fill='x', padx=10, pady=10)
         
@@ -162,6 +218,27 @@ class AdvancedPasswordGeneratorGUI:
         ttk.Button(existing_dict_frame, text="浏览...", command=self.browse_existing_dict).pack(side=tk.LEFT)
         ttk.Button(existing_dict_frame, text="使用此字典", command=self.use_existing_dict).pack(side=tk.LEFT, padx=(5, 0))
         
+        # 规则变形：对已有字典中的每个词应用选中的规则
+        ttk.Label(parent_frame, text="字典规则变形:", style='Header.TLabel').pack(pady=(0, 10))
+        
+        rule_preset_frame = ttk.Frame(parent_frame)
+        rule_preset_frame.pack(pady=(0, 5))
+        self.rule_preset_vars = {}
+        for index, name in enumerate(RULE_PRESETS):
+            var = tk.BooleanVar(value=name == "原词")
+            ttk.Checkbutton(rule_preset_frame, text=name, variable=var).grid(
+                row=index // 3, column=index % 3, sticky=tk.W, padx=(0, 10))
+            self.rule_preset_vars[name] = var
+        
+        rule_file_frame = ttk.Frame(parent_frame)
+        rule_file_frame.pack(pady=(0, 5))
+        ttk.Label(rule_file_frame, text="规则文件:").pack(side=tk.LEFT, padx=(0, 5))
+        self.rule_file_var = tk.StringVar()
+        ttk.Entry(rule_file_frame, textvariable=self.rule_file_var, width=20).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(rule_file_frame, text="浏览...", command=self.browse_rule_file).pack(side=tk.LEFT)
+        
+        ttk.Button(parent_frame, text="规则变形生成字典", command=self.start_rule_generation).pack(pady=(5, 10))
+        
         # 进度条
         self.progress_var = tk.DoubleVar()
         self.progress_bar = ttk.Progressbar(parent_frame, variable=self.progress_var, maximum=100)
@@ -224,6 +301,14 @@ class AdvancedPasswordGeneratorGUI:
         ttk.Entry(file_frame, textvariable=self.encrypted_file_var, width=25).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(file_frame, text="浏览...", command=self.browse_encrypted_file).pack(side=tk.LEFT)
         
+        # 并行验证设置
+        verify_frame = ttk.Frame(parent_frame)
+        verify_frame.pack(pady=(0, 10))
+        
+        ttk.Label(verify_frame, text="解密进程数:").pack(side=tk.LEFT, padx=(0, 5))
+        self.decrypt_workers_var = tk.StringVar(value="1")
+        ttk.Entry(verify_frame, textvariable=self.decrypt_workers_var, width=6).pack(side=tk.LEFT)
+        
         # 解密按钮
         decrypt_button_frame = ttk.Frame(parent_frame)
         decrypt_button_frame.pack(pady=20)
@@ -231,6 +316,17 @@ class AdvancedPasswordGeneratorGUI:
         ttk.Button(decrypt_button_frame, text="开始解密", command=self.start_decryption).pack(side=tk.LEFT, padx=5)
         ttk.Button(decrypt_button_frame, text="停止解密", command=self.stop_decryption).pack(side=tk.LEFT, padx=5)
         
+        # 边生成边解密（不需要先生成字典文件）
+        pipeline_frame = ttk.Frame(parent_frame)
+        pipeline_frame.pack(pady=(0, 10))
+        
+        ttk.Button(pipeline_frame, text="边生成边解密", command=self.start_pipeline_decryption).pack(side=tk.LEFT, padx=5)
+        self.tee_dict_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(pipeline_frame, text="同时保存字典", variable=self.tee_dict_var).pack(side=tk.LEFT, padx=5)
+        
+        # 已有字典 + 规则变形直接解密（不写出变形后的字典）
+        ttk.Button(parent_frame, text="字典+规则解密", command=self.start_rule_decryption).pack(pady=(0, 10))
+        
         # 解密密码显示区域
         ttk.Label(parent_frame, text="解密密码:", style='Header.TLabel').pack(pady=(20, 10))
         
@@ -272,7 +368,9 @@ class AdvancedPasswordGeneratorGUI:
 
 📋 基本功能：
 • 支持1-8位数字密码生成
-• 支持月日(MMDD)和日月(DDMM)密码
+• 支持月日(MMDD)和日月(DDMM)密码（只包含真实日期，含0229）
+• 支持年月日(YYYYMMDD)、短年月日(YYMMDD)、月日年(MMDDYYYY)密码，按年份范围生成（考虑闰年）
+• 支持 hashcat 风格的掩码密码（如 ?u?l?l?l?d?d?d?d），可按长度递增
 • 支持多前缀和多后缀组合
 • 支持哈希值生成和提取
 • 支持文件解密功能
@@ -287,8 +385,9 @@ class AdvancedPasswordGeneratorGUI:
   - 点击"删除"移除该输入框
 
 🔢 数字范围：
-• 格式：起始数字-结束数字
-• 示例：1980-1999 生成 1980|1981|...|1999
+• 格式：{起始数字..结束数字}，可直接在输入框中输入
+• 示例：{1980..1999} 生成 1980、1981、...、1999
+• 补零：{000..999} 生成 000、001、...、999
 
 🔤 字符范围：
 • 预定义选项：
@@ -297,15 +396,38 @@ class AdvancedPasswordGeneratorGUI:
   - 0-9: 数字
   - A-Za-z: 所有字母
   - A-Za-z0-9: 字母和数字
+• 字符集记号：[A-Za-z0-9]、[a-f0-9] 等，可直接在输入框中输入
 • 自定义字符：直接输入任意字符
 
+🎭 掩码：
+• 密码类型选择"掩码"后，在"掩码"输入框中填写，前缀和后缀同样生效
+• 字符集：?l 小写字母、?u 大写字母、?d 数字、?h 0-9a-f、?H 0-9A-F、
+  ?s 特殊字符、?a 全部可打印字符、?? 问号，其他字符按原样
+• 自定义字符集：在掩码前写 -1 ?l?d，掩码中用 ?1 引用（最多 -1 到 -4）
+  示例：-1 ?l?d ?u?1?1?1?d?d
+• 长度：留空只生成完整长度；填写 6-8 时依次生成掩码前 6、7、8 位
+• 点击"计算数量"可在生成前查看精确的候选数量
+
+🧩 字典规则变形：
+• 在"使用已有字典"中选择基础字典，勾选规则组（原词、首字母大写、大小写互换、
+  Leet 替换、反转、重复、末尾/开头追加数字、首字母大写并追加数字）
+• 也可选择 hashcat 格式的规则文件（每行一条，如 c$1$2、sa@so0、^1、r）
+• "规则变形生成字典"按输出设置写入输出文件，并行进程数同样生效
+• "字典+规则解密"边变形边验证，不写出变形后的字典
+
+📈 候选顺序：
+• 字典序：原有顺序（0000、0001、...）
+• 位置频率 / 马尔可夫：从"参考字典"（如泄露密码样本）统计字符规律，把每个位置的候选
+  按概率从高到低重新排列，常见密码（如 1234）更早出现，更快命中
+• 排序不改变候选总数和覆盖范围，分片并行、断点续传照常可用
+
 🔐 哈希选项：
 • 支持算法：MD5, SHA1, SHA256, SM3
 • 哈希提取：可设置起始位置和长度
 • 输出类型：原始密码或哈希值
 
 🔓 支持解密的文件类型：
-✅ ZIP文件 (.zip) - 完全支持密码破解
+✅ ZIP文件 (.zip) - 完全支持密码破解（ZipCrypto / WinZip AES）
 ✅ RAR文件 (.rar) - 完全支持密码破解  
 ✅ Word文档 (.doc, .docx) - 支持Office文档解密
 ✅ Excel文档 (.xls, .xlsx) - 支持Office文档解密
@@ -326,8 +448,8 @@ class AdvancedPasswordGeneratorGUI:
 • 解密过程可能需要较长时间，取决于字典大小
 
 💡 示例：
-前缀1: 1980-1999 (数字范围)
-前缀2: A-Z (字符范围)
+前缀1: {1980..1999} (数字范围)
+前缀2: [A-Z] (字符范围)
 密码类型: 月日
 后缀1: !@# (固定字符)
 将生成: 1980A0101!@#, 1980A0102!@#, ... 
@@ -337,6 +459,8 @@ class AdvancedPasswordGeneratorGUI:
 2. 选择要解密的加密文件
 3. 点击"开始解密"
 4. 查看解密结果
+• 也可直接点击"边生成边解密"，按左侧设置生成候选并立即验证，
+  无需先写出字典文件；勾选"同时保存字典"可同时写入输出文件
         """
         
         help_text.insert(tk.END, help_content)
@@ -367,11 +491,29 @@ class AdvancedPasswordGeneratorGUI:
             row=1, column=0, columnspan=4, sticky=tk.W, pady=(0, 10))
         
         self.digit_length_var = tk.StringVar(value="4")
-        digit_lengths = ["空值"] + [str(i) for i in range(1, 9)] + ["月日", "日月"]
+        digit_lengths = CORE_TYPES + [CORE_MASK]
         self.digit_length_combo = ttk.Combobox(self.scrollable_frame, textvariable=self.digit_length_var, 
                                               values=digit_lengths, state="readonly", width=15)
         self.digit_length_combo.grid(row=2, column=0, sticky=tk.W, pady=5, padx=(0, 10))
         
+        # 年份范围（年月日、短年月日、月日年使用）
+        ttk.Label(self.scrollable_frame, text="年份范围:").grid(row=2, column=1, sticky=tk.E, pady=5)
+        self.year_range_var = tk.StringVar(value=f"{DEFAULT_YEAR_RANGE[0]}-{DEFAULT_YEAR_RANGE[1]}")
+        ttk.Entry(self.scrollable_frame, textvariable=self.year_range_var, width=12).grid(
+            row=2, column=2, sticky=tk.W, pady=5, padx=(5, 0))
+        
+        # 掩码（密码类型为"掩码"时使用）及增量长度
+        mask_frame = ttk.Frame(self.scrollable_frame)
+        mask_frame.grid(row=2, column=3, sticky=tk.W, pady=5, padx=(10, 0))
+        ttk.Label(mask_frame, text="掩码:").pack(side=tk.LEFT)
+        self.mask_var = tk.StringVar(value="?u?l?l?l?d?d?d?d")
+        ttk.Entry(mask_frame, textvariable=self.mask_var, width=26).pack(side=tk.LEFT, padx=(5, 5))
+        ttk.Label(mask_frame, text="长度:").pack(side=tk.LEFT)
+        self.mask_length_var = tk.StringVar()
+        ttk.Entry(mask_frame, textvariable=self.mask_length_var, width=6).pack(side=tk.LEFT, padx=(5, 5))
+        ttk.Button(mask_frame, text="计算数量", command=self.show_candidate_count,
+                   width=8).pack(side=tk.LEFT)
+        
         # 前缀区域
         ttk.Label(self.scrollable_frame, text="前缀设置:", style='Header.TLabel').grid(
             row=3, column=0, columnspan=4, sticky=tk.W, pady=(20, 10))
@@ -399,6 +541,7 @@ class AdvancedPasswordGeneratorGUI:
         self.decryption_thread = None
         self.stop_flag = False
         self.decryptor = None
+        self.generation_progress = GenerationProgress()
     
     def add_prefix_frame(self):
         """添加一个新的前缀输入框"""
@@ -488,6 +631,10 @@ class AdvancedPasswordGeneratorGUI:
         end_var = tk.StringVar()
         ttk.Entry(range_frame, textvariable=end_var, width=10).grid(row=0, column=3, padx=5)
         
+        zero_pad_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(range_window, text="按结束值位数补零（如 000..999）",
+                        variable=zero_pad_var).pack()
+        
         def apply_range():
             try:
                 start = int(start_var.get())
@@ -496,8 +643,12 @@ class AdvancedPasswordGeneratorGUI:
                     messagebox.showerror("错误", "起始值不能大于结束值")
                     return
                 
-                numbers = [str(i) for i in range(start, end + 1)]
-                target_var.set('|'.join(numbers))
+                # 只写入范围记号，生成时按需取值，不展开为 '|' 连接的长字符串
+                if zero_pad_var.get():
+                    width = len(str(end))
+                    target_var.set(f"{{{start:0{width}d}..{end}}}")
+                else:
+                    target_var.set(f"{{{start}..{end}}}")
                 range_window.destroy()
                 
             except ValueError:
@@ -530,7 +681,7 @@ class AdvancedPasswordGeneratorGUI:
         
         for range_name, chars in char_ranges:
             ttk.Button(char_window, text=range_name, 
-                      command=lambda c=chars, var=target_var: self._apply_char_range(c, var, char_window),
+                      command=lambda r=range_name, var=target_var: self._apply_char_range(r, var, char_window),
                       width=20).pack(pady=2)
         
         # 分隔线
@@ -595,9 +746,9 @@ class AdvancedPasswordGeneratorGUI:
         ttk.Button(char_window, text="使用字符范围", 
                   command=apply_custom_range, width=20).pack(pady=10)
     
-    def _apply_char_range(self, chars, target_var, window):
-        """应用字符范围"""
-        target_var.set('|'.join(list(chars)))
+    def _apply_char_range(self, range_name, target_var, window):
+        """应用字符范围（写入 [A-Z] 形式的字符集记号）"""
+        target_var.set(f"[{range_name}]")
         window.destroy()
     
     def _apply_custom_chars(self, custom_chars, target_var, window, is_range=False):
@@ -616,7 +767,7 @@ class AdvancedPasswordGeneratorGUI:
     def browse_output_file(self):
         filename = filedialog.asksaveasfilename(
             defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+            filetypes=[("Text files", "*.txt"), ("Compressed dictionaries", "*.gz *.xz *.zst"), ("All files", "*.*")],
             initialfile=self.output_file_var.get()
         )
         if filename:
@@ -625,7 +776,7 @@ class AdvancedPasswordGeneratorGUI:
     def browse_existing_dict(self):
         """浏览已有字典文件"""
         filename = filedialog.askopenfilename(
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+            filetypes=[("Text files", "*.txt"), ("Compressed dictionaries", "*.gz *.xz *.zst"), ("All files", "*.*")],
             title="选择已有密码字典文件"
         )
         if filename:
@@ -634,7 +785,7 @@ class AdvancedPasswordGeneratorGUI:
     def browse_dict_for_output(self):
         """为输出文件选择字典文件"""
         filename = filedialog.askopenfilename(
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+            filetypes=[("Text files", "*.txt"), ("Compressed dictionaries", "*.gz *.xz *.zst"), ("All files", "*.*")],
             title="选择密码字典文件"
         )
         if filename:
@@ -656,16 +807,126 @@ class AdvancedPasswordGeneratorGUI:
         self.output_file_var.set(existing_dict)
         messagebox.showinfo("成功", f"已选择字典文件: {os.path.basename(existing_dict)}\n现在可以使用右侧的解密功能")
     
+    def browse_train_dict(self):
+        filename = filedialog.askopenfilename(
+            filetypes=[("Text files", "*.txt"), ("Compressed dictionaries", "*.gz *.xz *.zst"), ("All files", "*.*")],
+            title="选择训练排序模型的参考字典"
+        )
+        if filename:
+            self.train_dict_var.set(filename)
+    
+    def _order_model(self, train_path):
+        """训练（或复用上次训练的）排序模型；参考字典未改变时不重复训练"""
+        stat = os.stat(train_path)
+        key = (os.path.abspath(train_path), stat.st_size, stat.st_mtime)
+        if self._order_model_cache is None or self._order_model_cache[0] != key:
+            self._order_model_cache = (key, CharModel.from_file(train_path, DEFAULT_TRAIN_WORDS))
+        return self._order_model_cache[1]
+    
+    def browse_rule_file(self):
+        filename = filedialog.askopenfilename(
+            filetypes=[("Rule files", "*.rule *.txt"), ("All files", "*.*")],
+            title="选择规则文件"
+        )
+        if filename:
+            self.rule_file_var.set(filename)
+    
+    def _selected_rules(self):
+        """返回选中的预置规则组和规则文件中的规则；未选择时抛出 ValueError"""
+        rules = preset_rules([name for name, var in self.rule_preset_vars.items() if var.get()])
+        rule_file = self.rule_file_var.get().strip()
+        if rule_file:
+            rules += load_rule_file(rule_file)
+        if not rules:
+            raise ValueError("请至少选择一个规则组或规则文件")
+        return rules
+    
+    def _rule_inputs(self):
+        """读取基础字典和规则，无效时提示并返回 None"""
+        base_dict = self.existing_dict_var.get().strip()
+        if not base_dict or not os.path.exists(base_dict):
+            messagebox.showerror("错误", "请先在\"使用已有字典\"中选择存在的基础字典文件")
+            return None
+        try:
+            rules = self._selected_rules()
+            # 提前编译一次，规则格式错误时在界面提示
+            RuleSet(rules)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("输入错误", str(e))
+            return None
+        return base_dict, rules
+    
+    def start_rule_generation(self):
+        """对已有字典应用规则，按输出设置写入输出文件"""
+        inputs = self._rule_inputs()
+        if inputs is None or not self.validate_inputs():
+            return
+        base_dict, rules = inputs
+        output_file = self.output_file_var.get().strip()
+        if os.path.abspath(output_file) == os.path.abspath(base_dict):
+            messagebox.showerror("错误", "输出文件不能与基础字典相同")
+            return
+        
+        self.stop_flag = False
+        self.disable_buttons()
+        self.progress_var.set(0)
+        self.status_var.set("正在应用规则...")
+        
+        self.generation_thread = threading.Thread(target=self._run_rule_generation,
+                                                  args=(base_dict, rules, output_file))
+        self.generation_thread.daemon = True
+        self.generation_thread.start()
+    
+    def _run_rule_generation(self, base_dict, rules, output_file):
+        compression = self.compression_var.get()
+        compression_level_text = self.compression_level_var.get().strip()
+        try:
+            progress = self.generation_progress
+            progress.reset(0)
+            self.root.after(0, self._poll_generation_progress)
+            written = mangle_dictionary(
+                base_dict, rules, output_file, workers=int(self.workers_var.get()),
+                output_type=self.output_type_var.get(), hash_algo=self.hash_algo_var.get(),
+                start_pos=int(self.start_pos_var.get()), segment_length=int(self.segment_length_var.get()),
+                progress=progress, stop_check=lambda: self.stop_flag,
+                buffer_size=int(float(self.buffer_mb_var.get()) * 1024 * 1024),
+                compression=None if compression == "auto" else compression,
+                compression_level=int(compression_level_text) if compression_level_text else None)
+            progress.finished = True
+            if not self.stop_flag:
+                self.root.after(0, lambda: self.status_var.set(f"完成！共生成 {written} 个规则变形候选"))
+                self.root.after(0, lambda: messagebox.showinfo(
+                    "完成", f"规则变形完成！\n{len(rules)} 条规则，共生成 {written} 个候选\n保存到: {output_file}"))
+            else:
+                self.root.after(0, lambda: self.status_var.set("已停止"))
+        except Exception as e:
+            message = f"规则变形过程中出现错误: {e}"
+            self.root.after(0, lambda message=message: messagebox.showerror("错误", message))
+            self.root.after(0, lambda: self.status_var.set("错误"))
+        finally:
+            self.generation_progress.finished = True
+            self.root.after(0, self.enable_buttons)
+    
     def validate_inputs(self):
         try:
             digit_length_str = self.digit_length_var.get()
             
-            # 检查是否是空值、月日或日月选项
-            if digit_length_str not in ["空值", "月日", "日月"]:
+            if digit_length_str == CORE_MASK:
+                # 解析掩码、自定义字符集和长度范围，格式错误时抛出 ValueError
+                mask_from_text(self.mask_var.get(), self.mask_length_var.get())
+            # 检查是否是空值或日期选项
+            elif digit_length_str != CORE_EMPTY and digit_length_str not in DATE_CORE_FORMATS:
                 digit_length = int(digit_length_str)
                 if digit_length < 1 or digit_length > 8:
                     raise ValueError("数字位数必须在1-8之间")
             
+            parse_year_range(self.year_range_var.get())
+            
+            if self.ORDER_LABELS[self.order_var.get()] != ORDER_LEXICOGRAPHIC:
+                train_path = self.train_dict_var.get().strip()
+                if not train_path or not os.path.exists(train_path):
+                    raise ValueError("按概率排序需要选择存在的参考字典")
+            
             start_pos = int(self.start_pos_var.get())
             if start_pos < 0:
                 raise ValueError("起始位置不能为负数")
@@ -673,6 +934,17 @@ class AdvancedPasswordGeneratorGUI:
             segment_length = int(self.segment_length_var.get())
             if segment_length <= 0:
                 raise ValueError("提取长度必须大于0")
+            
+            workers = int(self.workers_var.get())
+            if workers < 1:
+                raise ValueError("并行进程数必须大于0")
+            
+            buffer_mb = float(self.buffer_mb_var.get())
+            if buffer_mb <= 0:
+                raise ValueError("写入缓冲必须大于0")
+            
+            if self.compression_level_var.get().strip():
+                int(self.compression_level_var.get())
                 
             return True
         except ValueError as e:
@@ -681,152 +953,99 @@ class AdvancedPasswordGeneratorGUI:
     
     def _parse_options(self, var_list):
         """解析选项列表，处理数字范围和字符范围"""
-        all_options = []
-        for var in var_list:
-            value = var.get().strip()
-            if not value:
-                all_options.append([""])  # 空字符串
-                continue
-            
-            if '|' in value:
-                # 已经是分隔的选项
-                options = value.split('|')
-                all_options.append(options)
-            else:
-                # 单个值
-                all_options.append([value])
-        
-        return all_options
+        return [parse_option_text(var.get()) for var in var_list]
+    
+    def build_password_spec(self):
+        """根据界面输入构建密码空间描述（含候选顺序）；可能需要训练模型，应在工作线程中调用"""
+        return self._apply_order(self.build_base_spec(), self._order_settings())
+    
+    def _order_settings(self):
+        """返回 (排序方式, 参考字典路径)"""
+        return self.ORDER_LABELS[self.order_var.get()], self.train_dict_var.get().strip()
+    
+    def _apply_order(self, spec, order):
+        """按候选顺序包装密码空间；训练参考字典可能较慢，应在工作线程中调用"""
+        mode, train_path = order
+        if mode == ORDER_LEXICOGRAPHIC:
+            return spec
+        self.root.after(0, lambda: self.status_var.set("正在训练排序模型..."))
+        return apply_order(spec, mode, model=self._order_model(train_path))
+    
+    def build_base_spec(self):
+        """根据界面输入构建字典序的密码空间描述"""
+        if self.digit_length_var.get() == CORE_MASK:
+            return mask_from_text(self.mask_var.get(), self.mask_length_var.get(),
+                                  prefix_options=self._parse_options(self.prefix_vars),
+                                  suffix_options=self._parse_options(self.suffix_vars))
+        return PasswordSpec(
+            prefix_options=self._parse_options(self.prefix_vars),
+            core_type=self.digit_length_var.get(),
+            suffix_options=self._parse_options(self.suffix_vars),
+            year_range=parse_year_range(self.year_range_var.get()),
+        )
+    
+    def show_candidate_count(self):
+        """生成前显示精确的候选数量（掩码增量模式下列出各长度）"""
+        if not self.validate_inputs():
+            return
+        # 排序不影响数量，不需要训练模型
+        spec = self.build_base_spec()
+        lines = []
+        if self.digit_length_var.get() == CORE_MASK:
+            for length, _, count in spec.segments():
+                lines.append(f"{length} 位: {count:,}")
+        lines.append(f"共 {spec.total_combinations():,} 个{spec.describe()}")
+        messagebox.showinfo("候选数量", "\n".join(lines))
     
     def generate_passwords(self):
-        digit_length_str = self.digit_length_var.get()
         output_type = self.output_type_var.get()
         hash_algo = self.hash_algo_var.get()
         start_pos = int(self.start_pos_var.get())
         segment_length = int(self.segment_length_var.get())
         output_file = self.output_file_var.get()
-        
-        digits = '0123456789'
-        
-        # 处理前缀选项
-        prefix_options_list = self._parse_options(self.prefix_vars)
-        
-        # 处理后缀选项
-        suffix_options_list = self._parse_options(self.suffix_vars)
-        
-        # 检查选择的是空值、月日还是日月选项
-        use_empty = (digit_length_str == "空值")
-        use_month_day = (digit_length_str == "月日")
-        use_day_month = (digit_length_str == "日月")
-        
-        # 生成月日或日月密码
-        date_options = []
-        if use_month_day or use_day_month:
-            # 生成所有可能的月日组合（0101-1231）或日月组合（0101-3112）
-            for month in range(1, 13):
-                for day in range(1, 32):  # 最大31天
-                    month_str = str(month).zfill(2)
-                    day_str = str(day).zfill(2)
-                    if use_month_day:
-                        date_options.append(month_str + day_str)  # 月日格式：MMDD
-                    else:
-                        date_options.append(day_str + month_str)  # 日月格式：DDMM
-        elif not use_empty:
-            # 使用普通数字位数
-            digit_length = int(digit_length_str)
-        
-        # 计算总组合数
-        total_prefix_combinations = 1
-        for options in prefix_options_list:
-            total_prefix_combinations *= len(options)
-        
-        total_suffix_combinations = 1
-        for options in suffix_options_list:
-            total_suffix_combinations *= len(options)
-        
-        if use_month_day or use_day_month:
-            total_combinations = total_prefix_combinations * len(date_options) * total_suffix_combinations
-        elif use_empty:
-            total_combinations = total_prefix_combinations * total_suffix_combinations
-        else:
-            total_combinations = total_prefix_combinations * (10 ** digit_length) * total_suffix_combinations
+        workers = int(self.workers_var.get())
+        per_shard_files = self.per_shard_var.get()
+        resume = self.resume_var.get()
+        buffer_size = int(float(self.buffer_mb_var.get()) * 1024 * 1024)
+        compression = self.compression_var.get()
+        compression_level_text = self.compression_level_var.get().strip()
+        compression_level = int(compression_level_text) if compression_level_text else None
+        if compression in COMPRESSION_EXTENSIONS and not output_file.lower().endswith(COMPRESSION_EXTENSIONS[compression]):
+            # 压缩字典需要带扩展名，解密时才能自动识别
+            output_file += COMPRESSION_EXTENSIONS[compression]
+            self.root.after(0, lambda: self.output_file_var.set(output_file))
         
         processed = 0
         
-        output_type_text = "哈希值" if output_type == "hash" else "原始密码"
-        if use_month_day:
-            password_type_text = "月日密码"
-        elif use_day_month:
-            password_type_text = "日月密码"
-        else:
-            password_type_text = f"{digit_length}位数字密码"
-            
-        self.root.after(0, lambda: self.status_var.set(f"正在生成 {total_combinations} 个{password_type_text}{output_type_text}..."))
-        
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                # 生成所有前缀组合
-                for prefix_combo in itertools.product(*prefix_options_list):
-                    prefix_str = ''.join(prefix_combo)
-                    
-                    if use_month_day or use_day_month:
-                        # 生成月日或日月密码
-                        for date_option in date_options:
-                            # 生成所有后缀组合
-                            for suffix_combo in itertools.product(*suffix_options_list):
-                                if self.stop_flag:
-                                    break
-                                    
-                                suffix_str = ''.join(suffix_combo)
-                                password = prefix_str + date_option + suffix_str
-                                result = self._process_password(password, output_type, hash_algo, start_pos, segment_length)
-                                f.write(result + '\n')
-                                
-                                processed += 1
-                                progress = (processed / total_combinations) * 100
-                                self.root.after(0, lambda p=progress: self.progress_var.set(p))
-                                
-                                if processed % 1000 == 0:
-                                    self.root.after(0, lambda: self.status_var.set(
-                                        f"已处理 {processed}/{total_combinations} ({progress:.1f}%)"))
-                    elif use_empty:
-                        # 生成空值密码（只有前缀和后缀）
-                        for suffix_combo in itertools.product(*suffix_options_list):
-                            if self.stop_flag:
-                                break
-                                
-                            suffix_str = ''.join(suffix_combo)
-                            password = prefix_str + suffix_str
-                            result = self._process_password(password, output_type, hash_algo, start_pos, segment_length)
-                            f.write(result + '\n')
-                            
-                            processed += 1
-                            progress = (processed / total_combinations) * 100
-                            self.root.after(0, lambda p=progress: self.progress_var.set(p))
-                            
-                            if processed % 1000 == 0:
-                                self.root.after(0, lambda: self.status_var.set(
-                                    f"已处理 {processed}/{total_combinations} ({progress:.1f}%)"))
-                    else:
-                        # 生成普通数字密码
-                        for combo in itertools.product(digits, repeat=digit_length):
-                            # 生成所有后缀组合
-                            for suffix_combo in itertools.product(*suffix_options_list):
-                                if self.stop_flag:
-                                    break
-                                    
-                                suffix_str = ''.join(suffix_combo)
-                                password = prefix_str + ''.join(combo) + suffix_str
-                                result = self._process_password(password, output_type, hash_algo, start_pos, segment_length)
-                                f.write(result + '\n')
-                                
-                                processed += 1
-                                progress = (processed / total_combinations) * 100
-                                self.root.after(0, lambda p=progress: self.progress_var.set(p))
-                                
-                                if processed % 1000 == 0:
-                                    self.root.after(0, lambda: self.status_var.set(
-                                        f"已处理 {processed}/{total_combinations} ({progress:.1f}%)"))
+            spec = self.build_password_spec()
+            total_combinations = spec.total_combinations()
+            
+            output_type_text = "哈希值" if output_type == "hash" else "原始密码"
+            password_type_text = spec.describe()
+                
+            self.root.after(0, lambda: self.status_var.set(f"正在生成 {total_combinations} 个{password_type_text}{output_type_text}..."))
+            
+            progress = self.generation_progress
+            progress.reset(total_combinations)
+            self.root.after(0, self._poll_generation_progress)
+            
+            if workers > 1 or per_shard_files:
+                # 多进程分片生成
+                processed = generate_parallel(
+                    spec, output_file, output_type, hash_algo, start_pos, segment_length,
+                    workers=workers, per_shard_files=per_shard_files,
+                    progress=progress, stop_check=lambda: self.stop_flag, resume=resume,
+                    buffer_size=buffer_size, compression=compression,
+                    compression_level=compression_level)
+            else:
+                processed = generate_dictionary(
+                    spec, output_file, output_type, hash_algo, start_pos, segment_length,
+                    resume=resume, progress=progress, stop_check=lambda: self.stop_flag,
+                    buffer_size=buffer_size, compression=compression,
+                    compression_level=compression_level)
+            
+            progress.finished = True
             
             if not self.stop_flag:
                 self.root.after(0, lambda: self.status_var.set(
@@ -834,42 +1053,26 @@ class AdvancedPasswordGeneratorGUI:
                 self.root.after(0, lambda: messagebox.showinfo(
                     "完成", f"密码字典生成完成！\n共生成 {processed} 个{password_type_text}{output_type_text}\n保存到: {output_file}"))
             else:
-                self.root.after(0, lambda: self.status_var.set("已停止"))
+                self.root.after(0, lambda: self.status_var.set("已停止（断点已保存，勾选\"断点续传\"可继续）"))
                 
         except Exception as e:
             self.root.after(0, lambda: messagebox.showerror("错误", f"生成过程中出现错误: {str(e)}"))
             self.root.after(0, lambda: self.status_var.set("错误"))
         
         finally:
+            self.generation_progress.finished = True
             self.root.after(0, self.enable_buttons)
     
-    def _process_password(self, password, output_type, hash_algo, start_pos, segment_length):
-        """处理单个密码，根据输出类型返回结果"""
-        if output_type == "original":
-            # 使用原始密码
-            return password
-        else:
-            # 计算哈希值
-            if hash_algo == "MD5":
-                hash_value = hashlib.md5(password.encode('utf-8')).hexdigest()
-            elif hash_algo == "SHA1":
-                hash_value = hashlib.sha1(password.encode('utf-8')).hexdigest()
-            elif hash_algo == "SHA256":
-                hash_value = hashlib.sha256(password.encode('utf-8')).hexdigest()
-            elif hash_algo == "SM3":
-                try:
-                    msg = bytearray(password.encode('utf-8'))
-                    hash_value = sm3.sm3_hash(msg)
-                except:
-                    hash_value = hashlib.sha256(password.encode('utf-8')).hexdigest()
-            
-            # 提取哈希片段
-            if start_pos + segment_length > len(hash_value):
-                actual_length = len(hash_value) - start_pos
-            else:
-                actual_length = segment_length
-            
-            return hash_value[start_pos:start_pos + actual_length]
+    def _poll_generation_progress(self):
+        """按固定周期读取生成进度并刷新界面"""
+        progress = self.generation_progress
+        if progress.finished:
+            self.progress_var.set(progress.percent())
+            return
+        
+        self.progress_var.set(progress.percent())
+        self.status_var.set(progress.summary())
+        self.root.after(self.PROGRESS_POLL_MS, self._poll_generation_progress)
     
     def start_generation(self):
         if not self.validate_inputs():
@@ -958,6 +1161,10 @@ class AdvancedPasswordGeneratorGUI:
             messagebox.showerror("错误", f"密码字典文件不存在: {password_dict}")
             return
             
+        decrypt_workers = self._get_decrypt_workers()
+        if decrypt_workers is None:
+            return
+            
         # 确认开始解密
         if not messagebox.askyesno("确认", f"确定要开始解密文件吗？\n文件: {os.path.basename(encrypted_file)}\n将使用密码字典: {os.path.basename(password_dict)}"):
             return
@@ -970,7 +1177,8 @@ class AdvancedPasswordGeneratorGUI:
         # 初始化解密器
         self.decryptor = FileDecryptor(
             progress_callback=self._update_decrypt_progress,
-            status_callback=self._update_decrypt_status
+            status_callback=self._update_decrypt_status,
+            workers=decrypt_workers
         )
         
         # 在新线程中运行解密过程
@@ -981,11 +1189,123 @@ class AdvancedPasswordGeneratorGUI:
         self.decryption_thread.daemon = True
         self.decryption_thread.start()
     
-    def _run_decryption(self, encrypted_file, password_dict):
-        """运行解密过程"""
+    def _get_decrypt_workers(self):
+        """读取解密进程数，无效时提示并返回 None"""
+        try:
+            workers = int(self.decrypt_workers_var.get())
+            if workers < 1:
+                raise ValueError
+            return workers
+        except ValueError:
+            messagebox.showerror("输入错误", "解密进程数必须为正整数")
+            return None
+    
+    def start_pipeline_decryption(self):
+        """边生成边解密：按当前生成设置产生候选，直接交给解密器验证"""
+        encrypted_file = self.encrypted_file_var.get().strip()
+        
+        if not encrypted_file:
+            messagebox.showerror("错误", "请选择要解密的文件")
+            return
+        
+        if not self.validate_inputs():
+            return
+        
         try:
-            use_gpu = self.use_gpu_var.get()
-            result = self.decryptor.decrypt_file(encrypted_file, password_dict, use_gpu)
+            # 排序不影响数量；排序模型在解密线程中训练
+            spec = self.build_base_spec()
+        except ValueError as e:
+            messagebox.showerror("输入错误", str(e))
+            return
+        order = self._order_settings()
+        
+        tee_file = self.output_file_var.get().strip() if self.tee_dict_var.get() else None
+        
+        decrypt_workers = self._get_decrypt_workers()
+        if decrypt_workers is None:
+            return
+        
+        # 确认开始解密
+        if not messagebox.askyesno("确认", f"确定要边生成边解密吗？\n文件: {os.path.basename(encrypted_file)}\n候选数量: {spec.total_combinations()}"):
+            return
+            
+        self.stop_flag = False
+        self.disable_buttons()
+        self.progress_var.set(0)
+        self.status_var.set("正在准备解密...")
+        
+        # 初始化解密器
+        self.decryptor = FileDecryptor(
+            progress_callback=self._update_decrypt_progress,
+            status_callback=self._update_decrypt_status,
+            workers=decrypt_workers
+        )
+        
+        settings = (self.output_type_var.get(), self.hash_algo_var.get(),
+                    int(self.start_pos_var.get()), int(self.segment_length_var.get()))
+        
+        # 在新线程中运行解密过程
+        self.decryption_thread = threading.Thread(
+            target=self._run_decryption,
+            args=(encrypted_file, None, spec, settings, tee_file),
+            kwargs={'order': order}
+        )
+        self.decryption_thread.daemon = True
+        self.decryption_thread.start()
+    
+    def start_rule_decryption(self):
+        """已有字典经规则变形后直接交给解密器验证"""
+        encrypted_file = self.encrypted_file_var.get().strip()
+        if not encrypted_file:
+            messagebox.showerror("错误", "请选择要解密的文件")
+            return
+        inputs = self._rule_inputs()
+        if inputs is None:
+            return
+        decrypt_workers = self._get_decrypt_workers()
+        if decrypt_workers is None:
+            return
+        base_dict, rules = inputs
+        
+        if not messagebox.askyesno("确认", f"确定要使用字典+规则解密吗？\n文件: {os.path.basename(encrypted_file)}\n基础字典: {os.path.basename(base_dict)}\n规则数量: {len(rules)}"):
+            return
+        
+        self.stop_flag = False
+        self.disable_buttons()
+        self.progress_var.set(0)
+        self.status_var.set("正在准备解密...")
+        
+        self.decryptor = FileDecryptor(
+            progress_callback=self._update_decrypt_progress,
+            status_callback=self._update_decrypt_status,
+            workers=decrypt_workers
+        )
+        
+        self.decryption_thread = threading.Thread(
+            target=self._run_decryption,
+            args=(encrypted_file, None),
+            kwargs={'rules': (base_dict, rules)}
+        )
+        self.decryption_thread.daemon = True
+        self.decryption_thread.start()
+    
+    def _run_decryption(self, encrypted_file, password_dict, spec=None, settings=None, tee_file=None, rules=None,
+                        order=None):
+        """运行解密过程；给出 spec 时边生成边解密（order 为候选顺序设置），给出 rules（基础字典, 规则）时
+        边变形边解密，否则使用字典文件"""
+        try:
+            if rules is not None:
+                base_dict, rule_list = rules
+                with RuleMangler(base_dict, rule_list) as mangler:
+                    result = self.decryptor.decrypt_candidates(encrypted_file, mangler, mangler.fraction)
+            elif spec is not None:
+                if order is not None:
+                    spec = self._apply_order(spec, order)
+                result = generate_and_decrypt(self.decryptor, encrypted_file, spec, *settings,
+                                              tee_file=tee_file)
+            else:
+                use_gpu = self.use_gpu_var.get()
+                result = self.decryptor.decrypt_file(encrypted_file, password_dict, use_gpu)
             
             if result:
                 # 在密码框中显示解密成功的密码
@@ -1069,6 +1389,7 @@ class AdvancedPasswordGeneratorGUI:
     
 
 def main():
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = AdvancedPasswordGeneratorGUI(root)
     root.mainloop()
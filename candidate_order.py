@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+按概率排序候选（频率 / 马尔可夫）
+
+默认按 itertools.product 的字典序产生候选，1234、0000 这类常见密码可能排在很后面。
+本模块从参考字典训练字符模型，把每个位置的候选按概率从高到低重新排列：
+
+    frequency  按字符在密码中所处位置的出现频率排序（位置未知时使用整体频率）
+    markov     一阶马尔可夫：按"前一个字符之后出现该字符"的概率排序，排序表随前缀的
+               最后一个字符变化（与 hashcat 的 markov 模式相同的思路）
+
+每个位置的候选数量不变，只改变顺序，因此总数和覆盖范围与字典序完全相同，候选仍然可以
+按序号直接换算（分片并行、断点续传照常可用）。候选过多的位置（如超长的数字范围记号）
+保持原顺序。
+"""
+
+import hashlib
+import json
+import math
+from collections import Counter
+
+from date_tables import DateTable
+from dict_io import DictReader
+
+# 排序方式（lexicographic 为原有的字典序，不需要模型）
+ORDER_LEXICOGRAPHIC = "lexicographic"
+ORDER_FREQUENCY = "frequency"
+ORDER_MARKOV = "markov"
+ORDER_MODES = [ORDER_FREQUENCY, ORDER_MARKOV]
+
+# 训练时默认最多读取的参考词数量
+DEFAULT_TRAIN_WORDS = 1000000
+
+# 按位置统计频率的最大字符位置
+MAX_TRAIN_POSITIONS = 32
+
+# 候选数超过该值的位置不重新排序
+MAX_REORDER_OPTIONS = 65536
+
+# 马尔可夫模式下候选数不超过该值的位置按前一个字符分别排序，更大的位置只排序一次
+MAX_CONDITIONAL_OPTIONS = 4096
+
+# 末尾若干位置的组合数不超过该值时整体展开并缓存
+TAIL_BLOCK = 1024
+
+# 不重新排序的末尾位置（如超长的数字范围记号）每次切片取出的候选数量
+TAIL_SLICE = 65536
+
+# 马尔可夫模型中表示"密码开头"的前一个字符
+START = ''
+
+
+class CharModel:
+    """从参考字典训练的字符统计（加一平滑）"""
+
+    def __init__(self):
+        self.unigram = Counter()
+        self.positional = [Counter() for _ in range(MAX_TRAIN_POSITIONS)]
+        self.bigram = {}
+        self.words = 0
+        self._totals = {}
+
+    @classmethod
+    def train(cls, words, max_words=None):
+        model = cls()
+        for word in words:
+            if max_words is not None and model.words >= max_words:
+                break
+            model.add(word)
+        return model
+
+    @classmethod
+    def from_file(cls, path, max_words=None):
+        """从字典文件训练（支持 .gz/.xz/.zst）"""
+        with DictReader(path) as reader:
+            return cls.train(reader, max_words)
+
+    def add(self, word):
+        self.words += 1
+        self.unigram.update(word)
+        prev = START
+        for position, char in enumerate(word):
+            if position < MAX_TRAIN_POSITIONS:
+                self.positional[position][char] += 1
+            self.bigram.setdefault(prev, Counter())[char] += 1
+            prev = char
+        self._totals = {}
+
+    def _log_probability(self, table, key, char):
+        """table 中 key 对应的计数下 char 的对数概率；字符表大小加一，为未出现过的字符留出概率"""
+        counts = table.get(key) if key is not None else table
+        if not counts:
+            return -math.log(len(self.unigram) + 1)
+        total = self._totals.get((id(table), key))
+        if total is None:
+            total = self._totals[(id(table), key)] = sum(counts.values())
+        return math.log((counts.get(char, 0) + 1) / (total + len(self.unigram) + 1))
+
+    def _frequency_log_probability(self, char, position):
+        """按位置频率（位置未知或该位置没有训练数据时按整体频率）计算的对数概率"""
+        if position is not None and position < MAX_TRAIN_POSITIONS and self.positional[position]:
+            return self._log_probability(self.positional[position], None, char)
+        return self._log_probability(self.unigram, None, char)
+
+    def score(self, text, mode, offset=None, prev=None):
+        """返回 text 的对数概率
+
+        frequency 模式下 offset 为 text 在整个密码中的起始位置（未知时为 None）；
+        markov 模式下 prev 为前一个字符（START 表示密码开头，None 表示未知），前一个字符
+        未知或在训练数据中没有出现过时退回到位置频率。
+        """
+        total = 0.0
+        for index, char in enumerate(text):
+            position = None if offset is None else offset + index
+            if mode == ORDER_MARKOV and prev is not None and prev in self.bigram:
+                total += self._log_probability(self.bigram, prev, char)
+            else:
+                total += self._frequency_log_probability(char, position)
+            prev = char
+        return total
+
+    def signature(self):
+        """模型内容的摘要，用于任务指纹"""
+        data = [sorted(self.unigram.items()), [sorted(counts.items()) for counts in self.positional],
+                sorted((prev, sorted(counts.items())) for prev, counts in self.bigram.items())]
+        return hashlib.sha256(json.dumps(data, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+def _uniform_width(options):
+    """位置内所有候选等长时返回该长度，否则返回 None"""
+    if isinstance(options, DateTable):
+        return options.width
+    if len(options) > MAX_REORDER_OPTIONS:
+        return None
+    widths = {len(option) for option in options}
+    return widths.pop() if len(widths) == 1 else None
+
+
+class OrderedSpec:
+    """把任意密码空间（PasswordSpec、MaskSpec）的各位置按模型概率重新排序
+
+    接口与 PasswordSpec 相同。第 n 个候选按混合进制从高位到低位取各位置的排名，
+    每个位置使用的排序表由该位置（及马尔可夫模式下已确定部分的最后一个字符）决定。
+    """
+
+    def __init__(self, base, model, mode=ORDER_MARKOV):
+        if mode not in ORDER_MODES:
+            raise ValueError(f"不支持的排序方式: {mode}")
+        self.base = base
+        self.model = model
+        self.mode = mode
+        self.core_type = base.core_type
+        self._segments = base.position_segments()
+        self._offsets = [self._position_offsets(positions) for _, _, positions in self._segments]
+        self._orders = {}
+
+    def __getstate__(self):
+        # 排序表在各进程中按需重新计算
+        state = self.__dict__.copy()
+        state['_orders'] = {}
+        return state
+
+    @staticmethod
+    def _position_offsets(positions):
+        """每个位置在密码中的起始字符位置；前面有不等长的位置时为 None"""
+        offsets = []
+        offset = 0
+        for options in positions:
+            offsets.append(offset)
+            if offset is not None:
+                width = _uniform_width(options)
+                offset = None if width is None else offset + width
+        return offsets
+
+    def _conditional(self, options):
+        """该位置的排序表是否随前一个字符变化"""
+        return self.mode == ORDER_MARKOV and len(options) <= MAX_CONDITIONAL_OPTIONS
+
+    def _ordered(self, segment, level, head):
+        """返回第 segment 段第 level 个位置在前缀 head 之后使用的候选顺序"""
+        options = self._segments[segment][2][level]
+        if len(options) > MAX_REORDER_OPTIONS:
+            return options
+        prev = head[-1:] if self._conditional(options) else None
+        key = (segment, level, prev)
+        ordered = self._orders.get(key)
+        if ordered is None:
+            offset = self._offsets[segment][level]
+            if self.mode == ORDER_MARKOV and prev is None and level == 0:
+                prev = START
+            score = self.model.score
+            mode = self.mode
+            # 稳定排序：概率相同的候选保持原来的字典序
+            ordered = sorted(options, key=lambda option: -score(option, mode, offset, prev))
+            self._orders[key] = ordered
+        return ordered
+
+    def total_combinations(self):
+        return self.base.total_combinations()
+
+    def describe(self):
+        label = "马尔可夫概率" if self.mode == ORDER_MARKOV else "位置频率"
+        return f"{self.base.describe()}（按{label}排序）"
+
+    def __len__(self):
+        return self.total_combinations()
+
+    def __iter__(self):
+        yield from self.iter_range(0, self.total_combinations())
+
+    def iter_range(self, start, stop):
+        for segment, (offset, count, _) in enumerate(self._segments):
+            lo = max(start, offset)
+            hi = min(stop, offset + count)
+            if lo < hi:
+                yield from self._iter_segment(segment, lo - offset, hi - offset)
+
+    def _tail_level(self, segment):
+        """末尾若干位置的组合数不超过 TAIL_BLOCK 时合并为一个整体，返回其起始位置
+
+        不重新排序的末尾位置单独作为尾部，直接从原序列切片。
+        """
+        positions = self._segments[segment][2]
+        level = len(positions) - 1
+        size = len(positions[level])
+        if size > MAX_REORDER_OPTIONS:
+            return level
+        while level > 0 and size * len(positions[level - 1]) <= TAIL_BLOCK:
+            level -= 1
+            size *= len(positions[level])
+        return level
+
+    def _tail(self, segment, level, prev):
+        """第 level 个位置起的全部尾部组合（按排序后的顺序）
+
+        排序表只取决于已确定部分的最后一个字符，因此尾部列表按 prev 缓存；尾部的排序表
+        不随前一个字符变化时只缓存一份。尾部为不重新排序的位置时直接返回原（惰性）序列。
+        """
+        positions = self._segments[segment][2]
+        if len(positions[level]) > MAX_REORDER_OPTIONS:
+            return positions[level]
+        conditional = any(self._conditional(options) for options in positions[level:])
+        key = (segment, 'tail', level, prev if conditional else None)
+        tail = self._orders.get(key)
+        if tail is None:
+            tail = ['']
+            for index in range(level, len(positions)):
+                tail = [partial + option for partial in tail
+                        for option in self._ordered(segment, index, prev + partial)]
+            self._orders[key] = tail
+        return tail
+
+    def _iter_segment(self, segment, lo, hi):
+        """产生段内序号 [lo, hi) 的候选
+
+        尾部之前的位置按混合进制逐位进位（进位后重新取后续位置的排序表），
+        尾部整体从缓存的尾部列表中按排名切片。
+        """
+        count, positions = self._segments[segment][1:]
+        tail_level = self._tail_level(segment)
+        sizes = [len(options) for options in positions[:tail_level]]
+        tail_size = count
+        for size in sizes:
+            tail_size //= size
+
+        # 把 lo 换算为各位置的排名
+        ranks = []
+        rest, tail_rank = divmod(lo, tail_size)
+        for size in reversed(sizes):
+            rest, rank = divmod(rest, size)
+            ranks.append(rank)
+        ranks.reverse()
+
+        heads = [''] * (tail_level + 1)
+        orders = [None] * tail_level
+        for level in range(tail_level):
+            orders[level] = self._ordered(segment, level, heads[level])
+            heads[level + 1] = heads[level] + orders[level][ranks[level]]
+
+        remaining = hi - lo
+        while True:
+            head = heads[tail_level]
+            tail = self._tail(segment, tail_level, head[-1:])
+            take = min(tail_size - tail_rank, remaining)
+            for rank in range(tail_rank, tail_rank + take, TAIL_SLICE):
+                yield from [head + option for option in tail[rank:min(rank + TAIL_SLICE, tail_rank + take)]]
+            remaining -= take
+            if remaining <= 0:
+                return
+            tail_rank = 0
+
+            # 进位：找到第一个未溢出的位置，之后的位置排名归零并重新取排序表
+            level = tail_level - 1
+            ranks[level] += 1
+            while ranks[level] == sizes[level]:
+                ranks[level] = 0
+                level -= 1
+                ranks[level] += 1
+            heads[level + 1] = heads[level] + orders[level][ranks[level]]
+            for level in range(level + 1, tail_level):
+                orders[level] = self._ordered(segment, level, heads[level])
+                heads[level + 1] = heads[level] + orders[level][0]
+
+    def iter_grouped(self, start=0, stop=None):
+        """排序后同一前缀的候选不再连续，整体作为一组（前缀为空）"""
+        if stop is None:
+            stop = self.total_combinations()
+        yield '', self.iter_range(start, stop)
+
+    def candidate_at(self, index):
+        total = self.total_combinations()
+        if index < 0:
+            index += total
+        if not 0 <= index < total:
+            raise IndexError(f"序号超出范围: {index} (共 {total} 个)")
+        for segment, (offset, count, positions) in enumerate(self._segments):
+            if index < offset + count:
+                break
+        index -= offset
+        head = ''
+        weight = count
+        for level, options in enumerate(positions):
+            weight //= len(options)
+            rank, index = divmod(index, weight)
+            head += self._ordered(segment, level, head)[rank]
+        return head
+
+    def signature(self):
+        """返回描述密码空间的字符串，用于校验断点文件是否属于同一任务"""
+        return json.dumps([self.base.signature(), self.mode, self.model.signature()], ensure_ascii=False)
+
+
+def apply_order(spec, mode, train_path=None, max_words=DEFAULT_TRAIN_WORDS, model=None):
+    """按排序方式包装密码空间；字典序时原样返回。model 为空时从 train_path 训练"""
+    if mode == ORDER_LEXICOGRAPHIC:
+        return spec
+    if model is None:
+        if not train_path:
+            raise ValueError("按概率排序需要指定参考字典")
+        model = CharModel.from_file(train_path, max_words)
+    return OrderedSpec(spec, model, mode)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+日历日期表
+
+按格式（MMDD、DDMM、YYYYMMDD、YYMMDD、MMDDYYYY）预先生成只包含真实日期的候选表，
+考虑大小月和闰年（不含年份的格式包含 0229）。每张表以定宽 ASCII 字节串紧凑存储，
+同一进程内按 (格式, 年份范围) 只生成一次；DateTable 可以像列表一样按下标取值和迭代，
+也可以直接交给 NumPy 按定宽矩阵使用。
+"""
+
+import calendar
+import functools
+
+# 日期格式
+FORMAT_MMDD = "MMDD"
+FORMAT_DDMM = "DDMM"
+FORMAT_YYYYMMDD = "YYYYMMDD"
+FORMAT_YYMMDD = "YYMMDD"
+FORMAT_MMDDYYYY = "MMDDYYYY"
+DATE_FORMATS = [FORMAT_MMDD, FORMAT_DDMM, FORMAT_YYYYMMDD, FORMAT_YYMMDD, FORMAT_MMDDYYYY]
+
+# 需要年份范围的格式
+YEAR_FORMATS = [FORMAT_YYYYMMDD, FORMAT_YYMMDD, FORMAT_MMDDYYYY]
+
+# 默认年份范围（含两端）
+DEFAULT_YEAR_RANGE = (1950, 2030)
+
+# 不含年份的格式按闰年展开，使 0229 有效
+_LEAP_YEAR = 2000
+
+
+class DateTable:
+    """定宽日期候选表（只读序列）
+
+    data 为全部候选首尾相接的 ASCII 字节串，每个候选 width 字节。
+    """
+
+    def __init__(self, date_format, data, width, year_range=None):
+        self.date_format = date_format
+        self.data = data
+        self.width = width
+        self.year_range = year_range
+
+    def __len__(self):
+        return len(self.data) // self.width
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("日期表下标超出范围")
+        offset = index * self.width
+        return self.data[offset:offset + self.width].decode('ascii')
+
+    def __iter__(self):
+        data = self.data.decode('ascii')
+        width = self.width
+        for offset in range(0, len(data), width):
+            yield data[offset:offset + width]
+
+    def __reduce__(self):
+        # 子进程中按参数重新取表（各进程只生成一次）
+        if self.year_range is None:
+            return date_table, (self.date_format,)
+        return date_table, (self.date_format,) + tuple(self.year_range)
+
+    def signature(self):
+        """用于任务指纹的描述"""
+        if self.year_range is None:
+            return f"{self.date_format}:valid"
+        return f"{self.date_format}:{self.year_range[0]}-{self.year_range[1]}"
+
+
+def _iter_dates(years):
+    for year in years:
+        for month in range(1, 13):
+            for day in range(1, calendar.monthrange(year, month)[1] + 1):
+                yield year, month, day
+
+
+def _format_dates(date_format, year_start, year_end):
+    if date_format == FORMAT_MMDD:
+        return [f"{m:02d}{d:02d}" for _, m, d in _iter_dates([_LEAP_YEAR])]
+    if date_format == FORMAT_DDMM:
+        # 与原有日月顺序一致：按月份外层、日内层展开
+        return [f"{d:02d}{m:02d}" for _, m, d in _iter_dates([_LEAP_YEAR])]
+
+    years = range(year_start, year_end + 1)
+    if date_format == FORMAT_YYYYMMDD:
+        return [f"{y:04d}{m:02d}{d:02d}" for y, m, d in _iter_dates(years)]
+    if date_format == FORMAT_MMDDYYYY:
+        return [f"{m:02d}{d:02d}{y:04d}" for y, m, d in _iter_dates(years)]
+    if date_format == FORMAT_YYMMDD:
+        # 跨世纪的年份范围中两位年份会重复，只保留第一次出现
+        return list(dict.fromkeys(f"{y % 100:02d}{m:02d}{d:02d}" for y, m, d in _iter_dates(years)))
+    raise ValueError(f"不支持的日期格式: {date_format}")
+
+
+@functools.lru_cache(maxsize=None)
+def date_table(date_format, year_start=None, year_end=None):
+    """返回（缓存的）日期表；含年份的格式未指定范围时使用 DEFAULT_YEAR_RANGE"""
+    year_range = None
+    if date_format in YEAR_FORMATS:
+        if year_start is None or year_end is None:
+            year_start, year_end = DEFAULT_YEAR_RANGE
+        year_start, year_end = int(year_start), int(year_end)
+        if not 1 <= year_start <= year_end <= 9999:
+            raise ValueError(f"年份范围无效: {year_start}-{year_end}")
+        year_range = (year_start, year_end)
+    dates = _format_dates(date_format, year_start, year_end)
+    width = len(dates[0])
+    return DateTable(date_format, ''.join(dates).encode('ascii'), width, year_range)
+
+
+def parse_year_range(text):
+    """解析 "1950-2030" 或 "1950:2030" 形式的年份范围"""
+    text = text.strip().replace(':', '-')
+    parts = [part.strip() for part in text.split('-')]
+    if len(parts) != 2 or not all(part.isdigit() for part in parts):
+        raise ValueError(f"年份范围格式应为 起始年-结束年: {text}")
+    year_start, year_end = int(parts[0]), int(parts[1])
+    if not 1 <= year_start <= year_end <= 9999:
+        raise ValueError(f"年份范围无效: {text}")
+    return year_start, year_end
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+密码字典读写
+
+生成端把编码后的字节块累积到预分配的缓冲区中，按数 MB 一次写入二进制文件，
+减少系统调用和文本层编码开销；可选经过 gzip / xz / zstd 流式压缩。
+读取端按扩展名识别压缩格式并流式解压。
+"""
+
+import gzip
+import lzma
+import os
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 默认写入缓冲区大小（字节）
+DEFAULT_BUFFER_SIZE = 8 * 1024 * 1024
+
+# 默认每次读取的大小（字节）
+DEFAULT_READ_SIZE = 4 * 1024 * 1024
+
+# 压缩格式与扩展名
+COMPRESSION_NONE = "none"
+COMPRESSION_EXTENSIONS = {
+    "gzip": ".gz",
+    "xz": ".xz",
+    "zstd": ".zst",
+}
+DEFAULT_COMPRESSION_LEVELS = {
+    "gzip": 6,
+    "xz": 6,
+    "zstd": 3,
+}
+
+
+def available_compressions():
+    """返回当前环境可用的压缩格式"""
+    formats = [COMPRESSION_NONE, "gzip", "xz"]
+    if zstandard is not None:
+        formats.append("zstd")
+    return formats
+
+
+def detect_compression(path):
+    """按扩展名识别压缩格式"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.lzma':
+        return "xz"
+    for compression, compression_ext in COMPRESSION_EXTENSIONS.items():
+        if ext == compression_ext:
+            return compression
+    return COMPRESSION_NONE
+
+
+def resolve_compression(path, compression=None):
+    """compression 为空或 "auto" 时按输出文件扩展名决定压缩格式"""
+    if not compression or compression == "auto":
+        return detect_compression(path)
+    if compression not in COMPRESSION_EXTENSIONS and compression != COMPRESSION_NONE:
+        raise ValueError(f"不支持的压缩格式: {compression}")
+    if compression == "zstd" and zstandard is None:
+        raise ValueError("zstd 压缩需要安装 zstandard 库")
+    return compression
+
+
+def new_compressor(compression, level=None):
+    """创建一个压缩器，compress()/flush() 产生一个完整的压缩成员（gzip member / xz stream / zstd frame）"""
+    if level is None:
+        level = DEFAULT_COMPRESSION_LEVELS[compression]
+    if compression == "gzip":
+        return zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 输出 gzip 格式
+    if compression == "xz":
+        return lzma.LZMACompressor(format=lzma.FORMAT_XZ, preset=level)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd 压缩需要安装 zstandard 库")
+        return zstandard.ZstdCompressor(level=level).compressobj()
+    raise ValueError(f"不支持的压缩格式: {compression}")
+
+
+def compress_block(data, compression, level=None):
+    """把一块数据压缩为独立的压缩成员；多个成员首尾相接后仍可整体解压"""
+    if compression == COMPRESSION_NONE:
+        return data
+    compressor = new_compressor(compression, level)
+    return compressor.compress(data) + compressor.flush()
+
+
+class BufferedDictWriter:
+    """带预分配缓冲区的二进制字典写入器
+
+    write() 接收已编码的字节块；缓冲区写满时一次性写入文件（需要压缩时先经过压缩器）。
+    flush() 把缓冲区写入文件，压缩模式下同时结束当前压缩成员，使文件在此处可以被截断
+    后续写。tell() 在 flush() 后等于文件实际大小。
+    """
+
+    def __init__(self, path, append=False, buffer_size=DEFAULT_BUFFER_SIZE,
+                 compression=COMPRESSION_NONE, compression_level=None):
+        self.buffer_size = max(int(buffer_size), 4096)
+        self.compression = compression
+        self.compression_level = compression_level
+        self._compressor = None
+        self._member_open = False
+        if compression != COMPRESSION_NONE:
+            self._compressor = new_compressor(compression, compression_level)
+        # 自己管理缓冲，底层使用无缓冲的原始文件对象
+        self._file = open(path, 'ab' if append else 'wb', buffering=0)
+        self._buffer = bytearray(self.buffer_size)
+        self._view = memoryview(self._buffer)
+        self._used = 0
+        self._written = self._file.seek(0, 2)
+
+    def write(self, data):
+        size = len(data)
+        if self._used + size > self.buffer_size:
+            self._flush_buffer()
+            if size >= self.buffer_size:
+                # 超过缓冲区大小的数据块直接写入
+                self._write_all(data)
+                return
+        self._view[self._used:self._used + size] = data
+        self._used += size
+
+    def _write_all(self, data):
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+            self._member_open = True
+        self._write_raw(data)
+
+    def _write_raw(self, data):
+        view = memoryview(data)
+        while view:
+            written = self._file.write(view)
+            view = view[written:]
+        self._written += len(data)
+
+    def _flush_buffer(self):
+        if self._used:
+            self._write_all(self._view[:self._used])
+            self._used = 0
+
+    def flush(self):
+        self._flush_buffer()
+        if self._member_open:
+            self._write_raw(self._compressor.flush())
+            self._compressor = new_compressor(self.compression, self.compression_level)
+            self._member_open = False
+
+    def tell(self):
+        if self._compressor is not None:
+            return self._written
+        return self._written + self._used
+
+    def close(self):
+        if self._file.closed:
+            return
+        try:
+            self.flush()
+            if self._compressor is not None and self._written == 0:
+                # 没有写入任何数据时写一个空的压缩成员，使文件仍是合法的压缩格式
+                self._write_raw(compress_block(b'', self.compression, self.compression_level))
+        finally:
+            self._view.release()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _wrap_decompressor(raw, compression):
+    """在原始二进制文件对象外包装解压流"""
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode='rb')
+    if compression == "xz":
+        return lzma.LZMAFile(raw, 'rb')
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("读取 zstd 压缩字典需要安装 zstandard 库")
+        return zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+    return raw
+
+
+class DictReader:
+    """流式读取密码字典
+
+    按 read_size 大块读取（压缩字典按扩展名流式解压），逐个产生去除首尾空白后的非空行，
+    不需要把整个字典载入内存。fraction() 以已读取的原始文件字节数 / 文件大小估算进度，
+    无需预先统计行数。
+    """
+
+    def __init__(self, path, read_size=DEFAULT_READ_SIZE):
+        self.path = path
+        self.read_size = max(int(read_size), 4096)
+        self.total_bytes = os.path.getsize(path)
+        self._raw = open(path, 'rb')
+        # 空文件（如中途停止、尚未写入任何压缩成员的输出）按空字典处理
+        compression = detect_compression(path) if self.total_bytes else COMPRESSION_NONE
+        self._stream = _wrap_decompressor(self._raw, compression)
+
+    def position(self):
+        """已读取的原始文件字节数"""
+        return self._raw.tell()
+
+    def fraction(self):
+        if not self.total_bytes:
+            return 1.0
+        return min(self.position() / self.total_bytes, 1.0)
+
+    def __iter__(self):
+        tail = b''
+        while True:
+            block = self._stream.read(self.read_size)
+            if not block:
+                break
+            data = tail + block
+            cut = data.rfind(b'\n')
+            if cut < 0:
+                tail = data
+                continue
+            tail = data[cut + 1:]
+            for line in data[:cut].decode('utf-8').split('\n'):
+                line = line.strip()
+                if line:
+                    yield line
+
+        line = tail.decode('utf-8').strip()
+        if line:
+            yield line
+
+    def close(self):
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,22 +1,82 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import zipfile
-import rarfile
-import msoffcrypto
-import io
 import subprocess
 import os
 import tempfile
 import threading
 import shutil
+import itertools
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
+from dict_io import DictReader
+from verifiers import detect_verifier, supported_extensions
+
+# 支持的文件类型
+SUPPORTED_EXTENSIONS = supported_extensions()
+
+# 多进程验证时每批发送给子进程的密码数量
+DEFAULT_VERIFY_BATCH_SIZE = 256
+
+# 不支持批量校验的格式（每个候选的代价主要是 KDF）使用的批次大小，保证进度和停止响应及时
+UNBATCHED_VERIFY_BATCH_SIZE = 8
+
+# 解密过程中进度和状态回调的最小间隔（秒）
+TELEMETRY_INTERVAL = 0.25
+
+
+class DecryptTelemetry:
+    """限速的进度/状态上报
+
+    计数由验证循环自己累加（FileDecryptor._tried），本对象只按时间节流：
+    距上次上报不足 interval 秒时 due() 返回 False，调用方跳过进度计算和状态字符串格式化，
+    避免快速验证器（如 ZipCrypto 快速校验）被回调开销拖慢。
+    """
+    
+    def __init__(self, decryptor, interval=TELEMETRY_INTERVAL):
+        self.decryptor = decryptor
+        self.interval = interval
+        self.start_time = time.monotonic()
+        self._last = None
+    
+    def due(self):
+        now = time.monotonic()
+        if self._last is not None and now - self._last < self.interval:
+            return False
+        self._last = now
+        return True
+    
+    def rate(self):
+        """每秒尝试的密码数"""
+        elapsed = time.monotonic() - self.start_time
+        return self.decryptor._tried / elapsed if elapsed > 0 else 0.0
+    
+    def report(self, progress_fn, current=None):
+        """上报进度；current 为当前批次的第一个候选（可选）"""
+        progress = progress_fn() * 100
+        status = f"已尝试 {self.decryptor._tried} 个密码 ({progress:.1f}%, {self.rate():.0f} 个/秒)"
+        if current is not None:
+            status += f": {current}"
+        self.decryptor.update_progress(progress)
+        self.decryptor.update_status(status)
+
 
 class FileDecryptor:
-    def __init__(self, progress_callback=None, status_callback=None):
+    def __init__(self, progress_callback=None, status_callback=None, workers=1,
+                 batch_size=DEFAULT_VERIFY_BATCH_SIZE):
         self.progress_callback = progress_callback
         self.status_callback = status_callback
         self.stop_flag = False
+        # workers 大于1时使用多进程并行验证
+        self.workers = max(int(workers), 1)
+        self.batch_size = max(int(batch_size), 1)
+        self._cancel_event = None
+        self._verifier = None
+        self._verifier_state = None
+        self._verifier_path = None
+        self._tried = 0
         
     def update_progress(self, progress):
         if self.progress_callback:
@@ -27,25 +87,23 @@ class FileDecryptor:
             self.status_callback(status)
     
     def decrypt_file(self, encrypted_file, password_dict_file, use_gpu=False):
-        """使用密码字典解密文件"""
+        """使用密码字典解密文件（流式读取字典，不整体载入内存）"""
         try:
             self.stop_flag = False
             self.update_status("正在准备解密...")
             
-            # 读取密码字典
-            with open(password_dict_file, 'r', encoding='utf-8') as f:
-                passwords = [line.strip() for line in f if line.strip()]
-            
-            total_passwords = len(passwords)
-            
-            if use_gpu:
-                self.update_status(f"GPU加速模式 - 共 {total_passwords} 个密码需要尝试")
-                # 这里可以添加GPU加速的解密逻辑
-                # 目前先使用CPU模式，后续可以扩展GPU加速功能
-                result = self._decrypt_with_cpu(encrypted_file, passwords)
-            else:
-                self.update_status(f"CPU模式 - 共 {total_passwords} 个密码需要尝试")
-                result = self._decrypt_with_cpu(encrypted_file, passwords)
+            # 流式读取密码字典（.gz/.xz/.zst 压缩字典按扩展名流式解压）
+            with DictReader(password_dict_file) as reader:
+                size_text = f"字典大小 {reader.total_bytes / (1024 * 1024):.1f} MB"
+                
+                if use_gpu:
+                    self.update_status(f"GPU加速模式 - {size_text}")
+                    # 这里可以添加GPU加速的解密逻辑
+                    # 目前先使用CPU模式，后续可以扩展GPU加速功能
+                    result = self._decrypt_with_cpu(encrypted_file, reader, reader.fraction)
+                else:
+                    self.update_status(f"CPU模式 - {size_text}")
+                    result = self._decrypt_with_cpu(encrypted_file, reader, reader.fraction)
             
             return result
             
@@ -53,131 +111,174 @@ class FileDecryptor:
             self.update_status(f"解密过程中出现错误: {str(e)}")
             return None
     
-    def _decrypt_with_cpu(self, encrypted_file, passwords):
-        """使用CPU进行解密"""
-        total_passwords = len(passwords)
-        file_ext = os.path.splitext(encrypted_file)[1].lower()
-        
-        # 显示支持的文件类型
-        supported_extensions = ['.zip', '.rar', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx']
-        
-        if file_ext not in supported_extensions:
-            self.update_status(f"不支持的文件类型: {file_ext} (支持: {', '.join(supported_extensions)})")
+    def decrypt_candidates(self, encrypted_file, candidates, progress_fn=None):
+        """使用任意候选序列（如生成器产生的候选流）解密文件"""
+        try:
+            self.stop_flag = False
+            self.update_status("正在准备解密...")
+            return self._decrypt_with_cpu(encrypted_file, candidates, progress_fn)
+        except Exception as e:
+            self.update_status(f"解密过程中出现错误: {str(e)}")
             return None
+    
+    def _decrypt_with_cpu(self, encrypted_file, passwords, progress_fn=None):
+        """使用CPU进行解密
+
+        passwords 可以是列表或任意可迭代对象；progress_fn 返回 0-1 之间的完成比例，
+        为空时按列表长度计算。
+        """
+        self._tried = 0
+        if progress_fn is None:
+            total_passwords = len(passwords)
+            progress_fn = lambda: self._tried / total_passwords if total_passwords else 1.0
         
-        for i, password in enumerate(passwords):
+        try:
+            # 按文件魔数选择验证器并预先解析加密文件，文件损坏或不支持的加密方式在此直接报错
+            verifier = self._prepare_verifier(encrypted_file)
+            if verifier is None:
+                self.update_status(f"不支持的文件类型: {encrypted_file} (支持: {', '.join(SUPPORTED_EXTENSIONS)})")
+                return None
+            self.update_status(f"文件格式: {verifier.description}")
+            batch_size = self.batch_size
+            if not verifier.is_batchable(self._verifier_state):
+                batch_size = min(batch_size, UNBATCHED_VERIFY_BATCH_SIZE)
+            if self.workers > 1:
+                self._close_verifiers()
+                return self._decrypt_parallel(encrypted_file, verifier, passwords, progress_fn, batch_size)
+            return self._decrypt_serial(passwords, progress_fn, batch_size)
+        finally:
+            self._close_verifiers()
+    
+    def _decrypt_serial(self, passwords, progress_fn, batch_size):
+        """单线程按批验证"""
+        telemetry = DecryptTelemetry(self)
+        password_iter = iter(passwords)
+        for batch in iter(lambda: list(itertools.islice(password_iter, batch_size)), []):
             if self.stop_flag:
                 self.update_status("解密已停止")
                 return None
             
-            progress = (i / total_passwords) * 100
-            self.update_progress(progress)
-            self.update_status(f"正在尝试密码 {i+1}/{total_passwords}: {password}")
+            if telemetry.due():
+                telemetry.report(progress_fn, batch[0])
             
-            try:
-                if file_ext in ['.zip']:
-                    result = self._decrypt_zip(encrypted_file, password)
-                elif file_ext in ['.rar']:
-                    result = self._decrypt_rar(encrypted_file, password)
-                elif file_ext in ['.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx']:
-                    result = self._decrypt_office(encrypted_file, password)
-                else:
-                    self.update_status(f"不支持的文件类型: {file_ext}")
-                    return None
-                
-                if result:
-                    self.update_progress(100)
-                    self.update_status(f"解密成功！密码: {password}")
-                    return password
-                    
-            except Exception as e:
-                # 密码错误，继续尝试下一个
-                continue
+            index = self._check_batch(batch)
+            if index is not None:
+                password = batch[index]
+                self.update_progress(100)
+                self.update_status(f"解密成功！密码: {password}")
+                return password
+            self._tried += len(batch)
         
         self.update_status("所有密码尝试完毕，未能解密文件")
         return None
     
-    def _decrypt_zip(self, zip_file, password):
-        """验证ZIP文件密码"""
-        try:
-            with zipfile.ZipFile(zip_file, 'r') as zip_ref:
-                zip_ref.setpassword(password.encode('utf-8'))
-                file_list = zip_ref.namelist()
-                if not file_list:
-                    return False
-                
-                # 尝试实际读取文件数据来验证密码
-                try:
-                    with zip_ref.open(file_list[0], pwd=password.encode('utf-8')) as f:
-                        # 只读取少量数据来验证密码
-                        f.read(1)  # 读取1个字节就足够验证
-                    return True
-                except (RuntimeError, zipfile.BadZipFile):
-                    return False
-                    
-        except Exception as e:
-            return False
+    def _check_batch(self, batch):
+        """用当前验证器验证一批密码，返回第一个正确密码的下标，没有时返回 None"""
+        return self._verifier.check_batch(self._verifier_state, batch)
     
-    def _decrypt_rar(self, rar_file, password):
-        """验证RAR文件密码"""
-        try:
-            with rarfile.RarFile(rar_file, 'r') as rar_ref:
-                rar_ref.setpassword(password)
-                file_list = rar_ref.namelist()
-                if not file_list:
-                    return False
-                
-                # 尝试实际读取文件数据来验证密码
-                try:
-                    with rar_ref.open(file_list[0], pwd=password) as f:
-                        # 只读取少量数据来验证密码
-                        f.read(1)  # 读取1个字节就足够验证
-                    return True
-                except (rarfile.BadRarFile, rarfile.PasswordRequired, rarfile.RarCannotExec):
-                    return False
-                    
-        except Exception as e:
-            return False
-    
-    
-    def _decrypt_office(self, office_file, password):
-        """验证Office文档密码"""
-        try:
-            # 使用msoffcrypto库解密Office文档
-            with open(office_file, 'rb') as f:
-                office_file_obj = msoffcrypto.OfficeFile(f)
-                
-                # 检查文件是否加密
-                if not office_file_obj.is_encrypted():
-                    return False
-                
-                # 尝试使用密码解密
-                try:
-                    # 创建内存缓冲区来存储解密后的内容
-                    decrypted_stream = io.BytesIO()
-                    office_file_obj.load_key(password=password)
-                    office_file_obj.decrypt(decrypted_stream)
+    def _decrypt_parallel(self, encrypted_file, verifier, passwords, progress_fn, batch_size):
+        """多进程验证：密码按批分发给子进程，任一进程找到密码后通过共享事件通知其余进程停止"""
+        self._cancel_event = multiprocessing.Event()
+        self.update_status(f"多进程验证 - {verifier.description} - {self.workers} 个进程")
+        
+        found = None
+        telemetry = DecryptTelemetry(self)
+        max_pending = self.workers * 4
+        password_iter = iter(passwords)
+        batches = iter(lambda: list(itertools.islice(password_iter, batch_size)), [])
+        
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_verify_worker,
+                                 initargs=(encrypted_file, self._cancel_event)) as executor:
+            pending = {}
+            try:
+                while True:
+                    while len(pending) < max_pending and not self.stop_flag:
+                        batch = next(batches, None)
+                        if batch is None:
+                            break
+                        pending[executor.submit(_verify_batch, batch)] = len(batch)
                     
-                    # 如果解密成功，返回True
-                    return True
+                    if not pending or self.stop_flag:
+                        break
                     
-                except (msoffcrypto.exceptions.InvalidKeyError, 
-                        msoffcrypto.exceptions.DecryptionError):
-                    # 密码错误
-                    return False
-                except Exception as e:
-                    # 其他解密错误
-                    return False
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._tried += pending.pop(future)
+                        result = future.result()
+                        if result is not None:
+                            found = result
+                    if found is not None:
+                        break
                     
-        except Exception as e:
-            # 文件读取或其他错误
-            return False
+                    if telemetry.due():
+                        telemetry.report(progress_fn)
+            finally:
+                # 通知所有子进程停止并取消尚未开始的批次
+                self._cancel_event.set()
+                for future in pending:
+                    future.cancel()
+        
+        if found is not None:
+            self.update_progress(100)
+            self.update_status(f"解密成功！密码: {found}")
+            return found
+        if self.stop_flag:
+            self.update_status("解密已停止")
+            return None
+        
+        self.update_status("所有密码尝试完毕，未能解密文件")
+        return None
+    
+    def _prepare_verifier(self, encrypted_file):
+        """按文件魔数选择验证器插件，解析加密文件一次并缓存状态；无法识别时返回 None"""
+        if self._verifier is not None and self._verifier_path == encrypted_file:
+            return self._verifier
+        self._close_verifiers()
+        verifier = detect_verifier(encrypted_file)
+        if verifier is None:
+            return None
+        self._verifier_state = verifier.prepare(encrypted_file)
+        self._verifier = verifier
+        self._verifier_path = encrypted_file
+        return verifier
+    
+    def _close_verifiers(self):
+        """释放缓存的验证器状态"""
+        if self._verifier is not None:
+            self._verifier.close(self._verifier_state)
+        self._verifier = None
+        self._verifier_state = None
+        self._verifier_path = None
     
     def stop_decryption(self):
         """停止解密过程"""
         self.stop_flag = True
+        if self._cancel_event is not None:
+            self._cancel_event.set()
         self.update_status("正在停止解密...")
 
+# 多进程验证的子进程状态
+_worker_state = {}
+
+def _init_verify_worker(encrypted_file, cancel_event):
+    """子进程初始化：解析一次加密文件，保存验证器和共享的停止事件"""
+    decryptor = FileDecryptor()
+    decryptor._prepare_verifier(encrypted_file)
+    _worker_state['decryptor'] = decryptor
+    _worker_state['cancel_event'] = cancel_event
+
+def _verify_batch(batch):
+    """子进程：验证一批密码，找到时设置停止事件并返回密码"""
+    decryptor = _worker_state['decryptor']
+    cancel_event = _worker_state['cancel_event']
+    if cancel_event.is_set():
+        return None
+    index = decryptor._check_batch(batch)
+    if index is None:
+        return None
+    cancel_event.set()
+    return batch[index]
+
 # 测试函数
 def test_decryptor():
     decryptor = FileDecryptor(
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Office 文档密码验证器
+
+文档只打开和解析一次：EncryptionInfo（盐值、迭代次数、加密的校验值）由 msoffcrypto
+在构造时解析并缓存。每个候选只派生密钥并比较校验值，不再为每个候选解密整个文档；
+校验通过后才完整解密一次作为确认。
+
+- OOXML Agile 加密（Office 2010 及以后）：ECMA376Agile.verify_password
+- OOXML Standard 加密（Office 2007）：makekey_from_password + verifykey
+- 97-2003 二进制格式（doc / xls / ppt）：复用同一个已解析的文档对象调用 load_key，
+  load_key 内部只校验密码，不解密内容
+"""
+
+import io
+
+import msoffcrypto
+from msoffcrypto.format.ooxml import OOXMLFile
+from msoffcrypto.method.ecma376_agile import ECMA376Agile
+from msoffcrypto.method.ecma376_standard import ECMA376Standard
+
+
+class OfficeVerifier:
+    """Office 密码验证器：解析一次加密信息，逐个比较候选派生出的校验值"""
+
+    def __init__(self, office_file):
+        self.path = office_file
+        self._file = open(office_file, 'rb')
+        try:
+            self._office = msoffcrypto.OfficeFile(self._file)
+            self.encrypted = self._office.is_encrypted()
+            if isinstance(self._office, OOXMLFile):
+                self.kind = self._office.type
+                self.info = self._office.info
+            else:
+                self.kind = "legacy"
+                self.info = None
+        except Exception:
+            self._file.close()
+            raise
+
+    def quick_check(self, password):
+        """只派生密钥并比较校验值"""
+        try:
+            if self.kind == "agile":
+                info = self.info
+                return ECMA376Agile.verify_password(
+                    password,
+                    info["passwordSalt"],
+                    info["passwordHashAlgorithm"],
+                    info["encryptedVerifierHashInput"],
+                    info["encryptedVerifierHashValue"],
+                    info["spinValue"],
+                    info["passwordKeyBits"],
+                )
+            if self.kind == "standard":
+                header = self.info["header"]
+                verifier = self.info["verifier"]
+                key = ECMA376Standard.makekey_from_password(
+                    password,
+                    header["algId"],
+                    header["algIdHash"],
+                    header["providerType"],
+                    header["keySize"],
+                    verifier["saltSize"],
+                    verifier["salt"],
+                )
+                return ECMA376Standard.verifykey(
+                    key, verifier["encryptedVerifier"], verifier["encryptedVerifierHash"])
+            # 97-2003 格式：load_key 校验失败时抛出 InvalidKeyError
+            self._office.load_key(password=password)
+            return True
+        except Exception:
+            return False
+
+    def confirm(self, password):
+        """校验值匹配后完整解密一次，确认密码正确"""
+        try:
+            self._office.load_key(password=password)
+            self._office.decrypt(io.BytesIO())
+            return True
+        except Exception:
+            return False
+
+    def check(self, password):
+        """验证单个密码"""
+        if not self.encrypted:
+            return False
+        return self.quick_check(password) and self.confirm(password)
+
+    def check_batch(self, passwords):
+        """验证一批密码，返回第一个正确密码的下标，没有时返回 None"""
+        if not self.encrypted:
+            return None
+        for index, password in enumerate(passwords):
+            if self.quick_check(password) and self.confirm(password):
+                return index
+        return None
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
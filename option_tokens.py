@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+前缀/后缀输入框中的范围记号
+
+    {1980..1999}    数字范围（含两端），结果为 1980、1981、...、1999
+    {000..999}      任一端带前导零时按最长一端的位数补零：000、001、...、999
+    [A-Za-z0-9]     字符集，支持 X-Y 区间和单个字符（'-' 放在开头或结尾表示字面量）
+
+记号被解析为惰性序列：支持 len()、下标访问和迭代，但不会预先展开全部候选，
+输入框里也只保存简短的记号文本而不是 '|' 连接的长字符串。序列可以被 pickle
+（多进程生成时传给子进程），token() 返回规范的记号文本，用于任务指纹。
+"""
+
+import re
+
+NUMBER_RANGE_PATTERN = re.compile(r'^\{(-?\d+)\.\.(-?\d+)\}$')
+CHAR_SET_PATTERN = re.compile(r'^\[(.+)\]$')
+
+
+class NumberRange:
+    """惰性数字范围（含两端），width 大于 0 时补零到该位数"""
+
+    def __init__(self, first, last, width=0):
+        self.first = int(first)
+        self.last = int(last)
+        self.width = int(width)
+        self.step = 1 if self.last >= self.first else -1
+
+    def __len__(self):
+        return abs(self.last - self.first) + 1
+
+    def _format(self, value):
+        if self.width:
+            return f"{value:0{self.width}d}"
+        return str(value)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("数字范围下标超出范围")
+        return self._format(self.first + index * self.step)
+
+    def __iter__(self):
+        for value in range(self.first, self.last + self.step, self.step):
+            yield self._format(value)
+
+    def __eq__(self, other):
+        return isinstance(other, NumberRange) and self.token() == other.token()
+
+    def __hash__(self):
+        return hash(self.token())
+
+    def token(self):
+        if self.width:
+            return f"{{{self._format(self.first)}..{self._format(self.last)}}}"
+        return f"{{{self.first}..{self.last}}}"
+
+    def __repr__(self):
+        return f"NumberRange({self.token()})"
+
+
+class CharSet:
+    """字符集：每个候选为一个字符"""
+
+    def __init__(self, chars, spec=None):
+        self.chars = chars
+        self.spec = spec if spec is not None else chars
+
+    def __len__(self):
+        return len(self.chars)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self.chars[index])
+        return self.chars[index]
+
+    def __iter__(self):
+        return iter(self.chars)
+
+    def __eq__(self, other):
+        return isinstance(other, CharSet) and self.chars == other.chars
+
+    def __hash__(self):
+        return hash(self.chars)
+
+    def token(self):
+        return f"[{self.spec}]"
+
+    def __repr__(self):
+        return f"CharSet({self.token()})"
+
+
+def _expand_char_spec(spec):
+    """展开 A-Za-z0-9 形式的字符集描述，去重并保持顺序；无效时返回 None"""
+    chars = []
+    i = 0
+    while i < len(spec):
+        if i + 2 < len(spec) and spec[i + 1] == '-':
+            low, high = spec[i], spec[i + 2]
+            if low > high:
+                return None
+            chars.extend(chr(code) for code in range(ord(low), ord(high) + 1))
+            i += 3
+        else:
+            chars.append(spec[i])
+            i += 1
+    return ''.join(dict.fromkeys(chars))
+
+
+def parse_token(text):
+    """把整段文本解析为范围记号；不是记号时返回 None"""
+    match = NUMBER_RANGE_PATTERN.match(text)
+    if match:
+        first, last = match.groups()
+        width = 0
+        if any(len(value.lstrip('-')) > 1 and value.lstrip('-').startswith('0') for value in (first, last)):
+            width = max(len(first), len(last))
+        return NumberRange(first, last, width)
+
+    match = CHAR_SET_PATTERN.match(text)
+    if match:
+        chars = _expand_char_spec(match.group(1))
+        if chars:
+            return CharSet(chars, match.group(1))
+    return None
+
+
+def is_lazy_options(options):
+    return isinstance(options, (NumberRange, CharSet))
+
+
+def options_signature(options):
+    """用于任务指纹的候选描述：惰性序列使用记号文本，列表原样保留"""
+    if is_lazy_options(options):
+        return {"token": options.token()}
+    return list(options)
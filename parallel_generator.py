@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多进程分片生成密码字典
+
+把 前缀 × 核心 × 后缀 的密码空间按序号切分为若干区间，交给 ProcessPoolExecutor
+并行计算（哈希计算不再受 GIL 限制），再按顺序合并写入一个文件，或每个分片单独写文件。
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from dict_io import (BufferedDictWriter, DEFAULT_BUFFER_SIZE, COMPRESSION_NONE,
+                     COMPRESSION_EXTENSIONS, compress_block, resolve_compression)
+from password_engine import iter_output_chunks, split_ranges, task_fingerprint, open_checkpoint
+
+# 每个分片包含的候选数量
+DEFAULT_SHARD_SIZE = 200000
+
+
+def default_workers():
+    """默认进程数：CPU 核心数"""
+    return os.cpu_count() or 1
+
+
+def shard_path(output_file, shard_index, compression=COMPRESSION_NONE):
+    """分片文件名：password_dict.txt -> password_dict.txt.part00000
+
+    压缩输出时把分片编号放在压缩扩展名之前（password_dict.txt.part00000.gz），
+    以便读取端仍能按扩展名识别压缩格式。
+    """
+    ext = COMPRESSION_EXTENSIONS.get(compression, "")
+    if ext and output_file.lower().endswith(ext):
+        return f"{output_file[:-len(ext)]}.part{shard_index:05d}{ext}"
+    return f"{output_file}.part{shard_index:05d}{ext}"
+
+
+def _generate_shard(spec, start, stop, output_type, hash_algo, start_pos, segment_length, path=None,
+                    compression=COMPRESSION_NONE, compression_level=None):
+    """子进程：生成 [start, stop) 区间的结果
+
+    path 为空时返回编码后的文本块（由主进程按顺序合并），否则写入分片文件并返回条数。
+    分片文件先写临时文件再改名，存在即表示该分片已完整生成。
+    需要压缩时在子进程内把整块压缩为一个独立的压缩成员，合并时直接首尾相接即可。
+    """
+    chunks = [data for data, _ in iter_output_chunks(spec, output_type, hash_algo, start_pos,
+                                                     segment_length, start, stop)]
+    data = compress_block(b''.join(chunks), compression, compression_level)
+    if path is None:
+        return data
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return stop - start
+
+
+def generate_parallel(spec, output_file, output_type="original", hash_algo="MD5",
+                      start_pos=0, segment_length=8, workers=None,
+                      shard_size=DEFAULT_SHARD_SIZE, per_shard_files=False,
+                      progress=None, stop_check=None, start=0, stop=None, resume=False,
+                      buffer_size=DEFAULT_BUFFER_SIZE, compression=None, compression_level=None):
+    """多进程生成序号 [start, stop) 的密码字典
+
+    per_shard_files 为 False 时按序号顺序合并写入 output_file；为 True 时每个分片写入
+    shard_path(output_file, i)。progress 为 GenerationProgress（可选），stop_check 为
+    返回 True 时停止的可调用对象（可选）。分片按顺序完成后更新断点，resume 为 True 时
+    从断点继续（分片模式下断点之后已完整生成的分片文件直接沿用）；合并输出经过 buffer_size 字节的写入缓冲区。compression 为空时按输出文件
+    扩展名决定是否压缩，压缩在各子进程中完成。返回本次范围内已生成的总条数。
+    """
+    workers = workers or default_workers()
+    total = spec.total_combinations()
+    stop = total if stop is None else min(stop, total)
+    start = min(max(start, 0), stop)
+    compression = resolve_compression(output_file, compression)
+    fingerprint = task_fingerprint(spec, output_type, hash_algo, start_pos, segment_length, compression)
+    checkpoint, resumed = open_checkpoint(output_file, fingerprint, start, stop, resume,
+                                          uses_output_file=not per_shard_files)
+
+    # 分片编号相对于本次范围的起点，续传时保持不变
+    shard_size = max(int(shard_size), 1)
+    first_shard = (checkpoint.next_index - start) // shard_size
+    ranges = split_ranges(checkpoint.next_index, stop, shard_size)
+    if progress is not None:
+        progress.reset(stop - start)
+        progress.processed = checkpoint.next_index - start
+
+    processed = checkpoint.next_index - start
+    # 限制同时在途的分片数量，避免合并模式下结果堆积占用内存
+    max_pending = workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        out = None if per_shard_files else BufferedDictWriter(output_file, append=resumed,
+                                                              buffer_size=buffer_size)
+        try:
+            pending = []
+            next_shard = 0
+            while next_shard < len(ranges) or pending:
+                while next_shard < len(ranges) and len(pending) < max_pending:
+                    if stop_check and stop_check():
+                        break
+                    shard_start, shard_stop = ranges[next_shard]
+                    path = None
+                    if per_shard_files:
+                        path = shard_path(output_file, first_shard + next_shard, compression)
+                        if resumed and os.path.exists(path):
+                            # 上次中断前已写完（晚于最后一次断点更新）的分片
+                            pending.append((shard_start, shard_stop, None))
+                            next_shard += 1
+                            continue
+                    pending.append((shard_start, shard_stop, executor.submit(
+                        _generate_shard, spec, shard_start, shard_stop, output_type, hash_algo,
+                        start_pos, segment_length, path, compression, compression_level)))
+                    next_shard += 1
+
+                if stop_check and stop_check():
+                    for _, _, future in pending:
+                        if future is not None:
+                            future.cancel()
+                    break
+
+                # 按提交顺序取回结果，保证合并输出的顺序
+                shard_start, shard_stop, future = pending.pop(0)
+                result = future.result() if future is not None else None
+                if out is not None:
+                    out.write(result)
+                    out.flush()
+                checkpoint.update(shard_stop, out.tell() if out is not None else 0)
+                processed += shard_stop - shard_start
+                if progress is not None:
+                    progress.processed = processed
+        finally:
+            if out is not None:
+                out.close()
+
+    if checkpoint.next_index >= stop:
+        checkpoint.remove()
+    return processed
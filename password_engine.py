@@ -0,0 +1,769 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+密码生成引擎（无界面依赖）
+
+将前缀、核心（数字/月日/日月）、后缀组合成一个按位置展开的密码空间，
+可以在没有显示器的服务器上直接使用，也可以被 GUI 和 FileDecryptor 复用。
+"""
+
+import argparse
+import functools
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+import sm3_fast
+from date_tables import (DEFAULT_YEAR_RANGE, FORMAT_DDMM, FORMAT_MMDD, FORMAT_MMDDYYYY,
+                         FORMAT_YYMMDD, FORMAT_YYYYMMDD, YEAR_FORMATS, date_table, parse_year_range)
+from option_tokens import is_lazy_options, options_signature, parse_token
+from dict_io import (BufferedDictWriter, DEFAULT_BUFFER_SIZE, available_compressions,
+                     resolve_compression)
+
+DIGITS = '0123456789'
+
+# 核心类型：空值、1-8位数字、日期（只包含真实日期）
+CORE_EMPTY = "空值"
+CORE_MONTH_DAY = "月日"
+CORE_DAY_MONTH = "日月"
+CORE_YEAR_MONTH_DAY = "年月日"
+CORE_SHORT_YEAR_MONTH_DAY = "短年月日"
+CORE_MONTH_DAY_YEAR = "月日年"
+
+# 日期核心类型 -> 日期格式
+DATE_CORE_FORMATS = {
+    CORE_MONTH_DAY: FORMAT_MMDD,
+    CORE_DAY_MONTH: FORMAT_DDMM,
+    CORE_YEAR_MONTH_DAY: FORMAT_YYYYMMDD,
+    CORE_SHORT_YEAR_MONTH_DAY: FORMAT_YYMMDD,
+    CORE_MONTH_DAY_YEAR: FORMAT_MMDDYYYY,
+}
+
+CORE_TYPES = [CORE_EMPTY] + [str(i) for i in range(1, 9)] + list(DATE_CORE_FORMATS)
+
+
+def parse_option_text(value):
+    """解析单个前缀/后缀输入框的内容，返回候选列表
+
+    整段内容为范围记号（如 {1980..1999}、{000..999}、[A-Za-z0-9]）时返回惰性序列，不展开。
+    """
+    value = value.strip()
+    if not value:
+        return [""]  # 空字符串
+    token = parse_token(value)
+    if token is not None:
+        return token
+    if '|' in value:
+        # 已经是分隔的选项
+        return value.split('|')
+    # 单个值
+    return [value]
+
+
+def build_date_options(core_type, year_range=None):
+    """返回日期核心的全部真实日期（如月日 0101-1231，含 0229，不含 0231 等无效日期）"""
+    return list(_core_date_table(core_type, year_range))
+
+
+def _core_date_table(core_type, year_range=None):
+    date_format = DATE_CORE_FORMATS[core_type]
+    if date_format in YEAR_FORMATS:
+        return date_table(date_format, *(year_range or DEFAULT_YEAR_RANGE))
+    return date_table(date_format)
+
+
+class PasswordSpec:
+    """密码空间描述：前缀选项 × 核心 × 后缀选项
+
+    prefix_options / suffix_options 为列表的列表，每个子列表对应一个输入框的候选值；
+    core_type 为 CORE_TYPES 中的一项。year_range 为含年份的日期核心使用的 (起始年, 结束年)，
+    为空时使用 DEFAULT_YEAR_RANGE。
+    """
+
+    def __init__(self, prefix_options=None, core_type="4", suffix_options=None, year_range=None):
+        if core_type not in CORE_TYPES:
+            raise ValueError(f"不支持的密码类型: {core_type}")
+        self.prefix_options = [normalize_options(options) for options in (prefix_options or [[""]])]
+        self.suffix_options = [normalize_options(options) for options in (suffix_options or [[""]])]
+        self.core_type = core_type
+        self.year_range = tuple(year_range) if year_range else DEFAULT_YEAR_RANGE
+
+    def is_date_core(self):
+        return self.core_type in DATE_CORE_FORMATS
+
+    def uses_years(self):
+        return self.is_date_core() and DATE_CORE_FORMATS[self.core_type] in YEAR_FORMATS
+
+    def core_positions(self):
+        """返回核心部分的位置列表（每个位置一组候选字符串）"""
+        if self.core_type == CORE_EMPTY:
+            return []
+        if self.is_date_core():
+            return [_core_date_table(self.core_type, self.year_range)]
+        return [DIGITS] * int(self.core_type)
+
+    def positions(self):
+        """按输出顺序返回全部位置：前缀 + 核心 + 后缀"""
+        return self.prefix_options + self.core_positions() + self.suffix_options
+
+    def position_segments(self):
+        """返回 [(起始序号, 候选数, 位置列表)]；PasswordSpec 只有一段"""
+        return [(0, self.total_combinations(), self.positions())]
+
+    def total_combinations(self):
+        """计算总组合数"""
+        total = 1
+        for options in self.positions():
+            total *= len(options)
+        return total
+
+    def describe(self):
+        """返回密码类型的中文描述"""
+        if self.core_type == CORE_MONTH_DAY:
+            return "月日密码"
+        if self.core_type == CORE_DAY_MONTH:
+            return "日月密码"
+        if self.is_date_core():
+            year_start, year_end = self.year_range
+            return f"{self.core_type}密码（{year_start}-{year_end}年）"
+        if self.core_type == CORE_EMPTY:
+            return "前后缀组合密码"
+        return f"{self.core_type}位数字密码"
+
+    def __len__(self):
+        return self.total_combinations()
+
+    def __iter__(self):
+        """按 前缀 → 核心 → 后缀 的字典序逐个产生候选密码"""
+        yield from _iter_product(self.positions(), '')
+
+    def iter_range(self, start, stop):
+        """产生序号位于 [start, stop) 内的候选密码（与 __iter__ 的顺序一致）"""
+        yield from iter_positions(self.positions(), start, stop)
+
+    def iter_grouped(self, start=0, stop=None):
+        """按前缀分组产生序号 [start, stop) 的候选
+
+        每组为 (前缀字符串, 该前缀下 核心 + 后缀 部分的迭代器)，前缀与尾部拼接即为候选密码，
+        顺序与 iter_range 一致。尾部迭代器需在取下一组之前使用。
+        """
+        total = self.total_combinations()
+        stop = total if stop is None else min(stop, total)
+        yield from iter_grouped_positions(self.prefix_options, self.core_positions() + self.suffix_options,
+                                          start, stop)
+
+    def candidate_at(self, index):
+        """按混合进制把序号换算成对应的候选密码"""
+        total = self.total_combinations()
+        if index < 0:
+            index += total
+        if not 0 <= index < total:
+            raise IndexError(f"序号超出范围: {index} (共 {total} 个)")
+        return combo_at(self.positions(), index)
+
+    def signature(self):
+        """返回描述密码空间的字符串，用于校验断点文件是否属于同一任务"""
+        parts = [[options_signature(options) for options in self.prefix_options], self.core_type,
+                 [options_signature(options) for options in self.suffix_options]]
+        if self.is_date_core():
+            # 日期核心只包含真实日期，附加日期表描述（含年份范围）以区分旧的 12×31 断点
+            parts.append(self.core_positions()[0].signature())
+        return json.dumps(parts, ensure_ascii=False)
+
+
+def normalize_options(options):
+    """范围记号产生的惰性序列保持原样，其他可迭代对象转为列表"""
+    if is_lazy_options(options):
+        return options
+    return list(options)
+
+
+def iter_positions(positions, start, stop):
+    """产生位置列表 positions 展开后序号位于 [start, stop) 内的组合字符串"""
+    total = 1
+    for options in positions:
+        total *= len(options)
+    start = max(start, 0)
+    stop = min(stop, total)
+    if start >= stop:
+        return
+    if start == 0 and stop == total:
+        yield from _iter_product(positions, '')
+        return
+
+    # 每个位置的权重 = 其后所有位置候选数的乘积
+    weights = [1] * len(positions)
+    for level in range(len(positions) - 2, -1, -1):
+        weights[level] = weights[level + 1] * len(positions[level + 1])
+    yield from _iter_block(positions, weights, 0, '', start, stop)
+
+
+def iter_grouped_positions(prefix_positions, tail_positions, start, stop):
+    """按前缀分组产生 prefix_positions + tail_positions 展开后序号 [start, stop) 的候选
+
+    每组为 (前缀字符串, 尾部迭代器)，见 PasswordSpec.iter_grouped。
+    """
+    block = 1
+    for options in tail_positions:
+        block *= len(options)
+
+    index = max(start, 0)
+    while index < stop:
+        prefix_index, offset = divmod(index, block)
+        count = min(stop - index, block - offset)
+        prefix = combo_at(prefix_positions, prefix_index)
+        yield prefix, iter_positions(tail_positions, offset, offset + count)
+        index += count
+
+
+def _iter_product(positions, head):
+    """按字典序产生 head + 各位置组合（与 itertools.product 顺序一致）
+
+    itertools.product 会先把每个参数整体转为元组，因此范围记号产生的惰性序列逐个迭代，
+    只有最后一个惰性序列之后的普通列表交给 itertools.product。
+    """
+    lazy_end = 0
+    for level, options in enumerate(positions):
+        if is_lazy_options(options):
+            lazy_end = level + 1
+    if lazy_end == 0:
+        join = ''.join
+        for combo in itertools.product(*positions):
+            yield head + join(combo)
+        return
+    rest = positions[1:]
+    for option in positions[0]:
+        yield from _iter_product(rest, head + option)
+
+
+def combo_at(positions, index):
+    """把序号按混合进制（最后一个位置变化最快）分解并拼接对应的候选"""
+    parts = []
+    for options in reversed(positions):
+        index, digit = divmod(index, len(options))
+        parts.append(options[digit])
+    return ''.join(reversed(parts))
+
+
+def _iter_block(positions, weights, level, head, lo, hi):
+    """在第 level 个位置之后的子空间内产生序号 [lo, hi) 的候选，头部固定为 head"""
+    if level == len(positions):
+        yield head
+        return
+
+    options = positions[level]
+    weight = weights[level]
+    first = lo // weight
+    last = (hi - 1) // weight
+    for index in range(first, last + 1):
+        sub_lo = lo - index * weight if index == first else 0
+        sub_hi = hi - index * weight if index == last else weight
+        current = head + options[index]
+        if sub_lo == 0 and sub_hi == weight:
+            # 完整子块：直接展开
+            yield from _iter_product(positions[level + 1:], current)
+        else:
+            yield from _iter_block(positions, weights, level + 1, current, sub_lo, sub_hi)
+
+
+def split_ranges(start, stop, shard_size):
+    """把 [start, stop) 切分为若干个长度不超过 shard_size 的区间"""
+    shard_size = max(int(shard_size), 1)
+    return [(lo, min(lo + shard_size, stop)) for lo in range(start, stop, shard_size)]
+
+
+class GenerationProgress:
+    """生成进度计数器
+
+    工作线程只更新计数（整数赋值，无需回调），界面按固定周期轮询读取，
+    因此汇报开销与密码空间大小无关。
+    """
+
+    def __init__(self, total=0):
+        self.total = total
+        self.processed = 0
+        self.start_time = time.monotonic()
+        self.finished = False
+
+    def reset(self, total):
+        self.total = total
+        self.processed = 0
+        self.start_time = time.monotonic()
+        self.finished = False
+
+    def percent(self):
+        if not self.total:
+            return 100.0 if self.finished else 0.0
+        return min(self.processed / self.total * 100, 100.0)
+
+    def rate(self):
+        """返回吞吐量（个/秒）"""
+        elapsed = time.monotonic() - self.start_time
+        if elapsed <= 0:
+            return 0.0
+        return self.processed / elapsed
+
+    def eta(self):
+        """返回预计剩余秒数，无法估计时返回 None"""
+        rate = self.rate()
+        if rate <= 0:
+            return None
+        return max(self.total - self.processed, 0) / rate
+
+    def summary(self):
+        """返回形如 "已处理 a/b (x%) - r 个/秒 - 剩余 hh:mm:ss" 的状态文本"""
+        text = f"已处理 {self.processed}/{self.total} ({self.percent():.1f}%) - {self.rate():,.0f} 个/秒"
+        eta = self.eta()
+        if eta is not None:
+            text += f" - 剩余 {format_duration(eta)}"
+        return text
+
+
+def format_duration(seconds):
+    """把秒数格式化为 hh:mm:ss"""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+# 哈希算法名称 -> 构造函数（均支持 copy()，可以复用前缀的中间状态）
+HASH_CONSTRUCTORS = {
+    "MD5": hashlib.md5,
+    "SHA1": hashlib.sha1,
+    "SHA256": hashlib.sha256,
+    "SM3": sm3_fast.new,
+}
+
+
+def hash_constructor(hash_algo):
+    """返回支持 copy() 的哈希构造函数"""
+    try:
+        return HASH_CONSTRUCTORS[hash_algo]
+    except KeyError:
+        raise ValueError(f"不支持的哈希算法: {hash_algo}") from None
+
+
+class OutputTransform:
+    """编译后的输出变换
+
+    输出类型、哈希构造函数和片段的切片边界在构造时确定一次，之后：
+        apply(password)                  处理单个候选
+        apply_batch(passwords, prefix)   处理一批候选；prefix 非空时只哈希一次前缀，
+                                         每个候选复制前缀的中间状态后只处理自身部分
+    apply / apply_batch 是预先绑定好的闭包，逐个调用时没有额外的分支判断。
+    """
+
+    def __init__(self, output_type="original", hash_algo="MD5", start_pos=0, segment_length=8):
+        self.output_type = output_type
+        self.hash_algo = hash_algo
+        self.start_pos = start_pos
+        self.segment_length = segment_length
+        if output_type == "original":
+            self.apply = _identity
+            self.apply_batch = _concat_batch
+            return
+
+        new_hash = hash_constructor(hash_algo)
+        start, end = start_pos, start_pos + segment_length
+
+        def apply(password):
+            return new_hash(password.encode('utf-8')).hexdigest()[start:end]
+
+        def apply_batch(passwords, prefix=''):
+            if not prefix:
+                return [new_hash(password.encode('utf-8')).hexdigest()[start:end]
+                        for password in passwords]
+            copy = new_hash(prefix.encode('utf-8')).copy
+            results = []
+            append = results.append
+            for tail in passwords:
+                h = copy()
+                h.update(tail.encode('utf-8'))
+                append(h.hexdigest()[start:end])
+            return results
+
+        self.apply = apply
+        self.apply_batch = apply_batch
+
+    def __call__(self, password):
+        return self.apply(password)
+
+
+def _identity(password):
+    return password
+
+
+def _concat_batch(passwords, prefix=''):
+    if not prefix:
+        return list(passwords)
+    return [prefix + password for password in passwords]
+
+
+@functools.lru_cache(maxsize=16)
+def compile_output_transform(output_type, hash_algo, start_pos, segment_length):
+    """按输出设置返回（缓存的）OutputTransform"""
+    return OutputTransform(output_type, hash_algo, start_pos, segment_length)
+
+
+def process_password(password, output_type, hash_algo, start_pos, segment_length):
+    """处理单个密码，根据输出类型返回结果（原始密码或哈希片段）"""
+    return compile_output_transform(output_type, hash_algo, start_pos, segment_length).apply(password)
+
+
+# 逐个生成时每块包含的行数
+OUTPUT_CHUNK_ROWS = 4096
+
+
+def iter_outputs(spec, output_type="original", hash_algo="MD5", start_pos=0, segment_length=8,
+                 start=0, stop=None):
+    """逐个产生经过输出处理（原始密码或哈希片段）的结果"""
+    if stop is None:
+        stop = spec.total_combinations()
+    if output_type == "original":
+        yield from spec.iter_range(start, stop)
+        return
+    transform = compile_output_transform(output_type, hash_algo, start_pos, segment_length)
+    for batch in iter_output_batches(spec, transform, start, stop):
+        yield from batch
+
+
+def iter_output_batches(spec, transform, start=0, stop=None, batch_rows=OUTPUT_CHUNK_ROWS):
+    """按前缀分组、每批不超过 batch_rows 条产生输出列表
+
+    哈希输出时每个前缀只哈希一次，各候选复制前缀的中间状态后只处理 核心 + 后缀 部分。
+    """
+    apply_batch = transform.apply_batch
+    for prefix, tails in spec.iter_grouped(start, stop):
+        while True:
+            batch = list(itertools.islice(tails, batch_rows))
+            if not batch:
+                break
+            yield apply_batch(batch, prefix)
+
+
+def iter_output_chunks(spec, output_type="original", hash_algo="MD5", start_pos=0, segment_length=8,
+                       start=0, stop=None):
+    """按块产生序号 [start, stop) 的输出，每块为 (以换行分隔的 UTF-8 字节串, 条数)
+
+    原始密码输出且密码空间满足条件时使用 NumPy 批量生成，否则经编译好的输出变换按批处理后拼接。
+    """
+    if stop is None:
+        stop = spec.total_combinations()
+
+    if output_type == "original":
+        import vectorized_core
+        if vectorized_core.supports(spec):
+            yield from vectorized_core.iter_original_chunks(spec, start, stop)
+            return
+
+    transform = compile_output_transform(output_type, hash_algo, start_pos, segment_length)
+    pending = []
+    for batch in iter_output_batches(spec, transform, start, stop):
+        pending.extend(batch)
+        if len(pending) >= OUTPUT_CHUNK_ROWS:
+            yield ('\n'.join(pending) + '\n').encode('utf-8'), len(pending)
+            pending = []
+    if pending:
+        yield ('\n'.join(pending) + '\n').encode('utf-8'), len(pending)
+
+
+# 断点文件扩展名：password_dict.txt -> password_dict.txt.ckpt
+CHECKPOINT_SUFFIX = '.ckpt'
+
+# 单线程生成时每隔多少个候选刷新一次文件并保存断点
+CHECKPOINT_INTERVAL = 1000000
+
+
+def checkpoint_path(output_file):
+    return output_file + CHECKPOINT_SUFFIX
+
+
+def task_fingerprint(spec, output_type, hash_algo, start_pos, segment_length, compression="none"):
+    """生成任务指纹：密码空间 + 输出设置"""
+    text = json.dumps([spec.signature(), output_type, hash_algo, start_pos, segment_length, compression],
+                      ensure_ascii=False)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class GenerationCheckpoint:
+    """生成断点：记录已刷新到磁盘的最后位置
+
+    next_index 为下一个待生成候选的序号，bytes_written 为此时输出文件的字节数，
+    续传时先把输出文件截断到 bytes_written，再从 next_index 继续。
+    """
+
+    def __init__(self, path, fingerprint, start, stop, next_index=None, bytes_written=0):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.start = start
+        self.stop = stop
+        self.next_index = start if next_index is None else next_index
+        self.bytes_written = bytes_written
+
+    @classmethod
+    def load(cls, path):
+        """读取断点文件，不存在或损坏时返回 None"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls(path, data['fingerprint'], data['start'], data['stop'],
+                       data['next_index'], data['bytes_written'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def matches(self, fingerprint, start, stop):
+        return (self.fingerprint, self.start, self.stop) == (fingerprint, start, stop)
+
+    def update(self, next_index, bytes_written):
+        self.next_index = next_index
+        self.bytes_written = bytes_written
+        self.save()
+
+    def save(self):
+        """先写临时文件再替换，避免中途中断留下半个断点文件"""
+        data = {
+            'fingerprint': self.fingerprint,
+            'start': self.start,
+            'stop': self.stop,
+            'next_index': self.next_index,
+            'bytes_written': self.bytes_written,
+        }
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def open_checkpoint(output_file, fingerprint, start, stop, resume=False, uses_output_file=True):
+    """准备输出文件和断点
+
+    resume 为 True 且断点与当前任务一致时，把输出文件截断到断点位置并返回
+    (checkpoint, True)；否则新建断点并返回 (checkpoint, False)，调用方应重写输出文件。
+    uses_output_file 为 False 时（每个分片单独写文件）不检查也不截断 output_file。
+    """
+    path = checkpoint_path(output_file)
+    if resume:
+        checkpoint = GenerationCheckpoint.load(path)
+        if checkpoint is not None and checkpoint.matches(fingerprint, start, stop):
+            if not uses_output_file:
+                return checkpoint, True
+            if os.path.exists(output_file) and os.path.getsize(output_file) >= checkpoint.bytes_written:
+                os.truncate(output_file, checkpoint.bytes_written)
+                return checkpoint, True
+
+    checkpoint = GenerationCheckpoint(path, fingerprint, start, stop)
+    checkpoint.save()
+    return checkpoint, False
+
+
+def generate_dictionary(spec, output_file, output_type="original", hash_algo="MD5",
+                        start_pos=0, segment_length=8, start=0, stop=None, resume=False,
+                        progress=None, stop_check=None, checkpoint_interval=CHECKPOINT_INTERVAL,
+                        buffer_size=DEFAULT_BUFFER_SIZE, compression=None, compression_level=None):
+    """单线程生成序号 [start, stop) 的密码字典，支持断点续传
+
+    输出经过 buffer_size 字节的写入缓冲区，compression 为空时按输出文件扩展名决定是否压缩；
+    每隔 checkpoint_interval 个候选刷新文件并更新断点。正常完成后删除断点，中途停止时保留
+    断点以便续传。返回本次范围内已生成的总条数。
+    """
+    total = spec.total_combinations()
+    stop = total if stop is None else min(stop, total)
+    start = min(max(start, 0), stop)
+    compression = resolve_compression(output_file, compression)
+    fingerprint = task_fingerprint(spec, output_type, hash_algo, start_pos, segment_length, compression)
+    checkpoint, resumed = open_checkpoint(output_file, fingerprint, start, stop, resume)
+
+    index = checkpoint.next_index
+    if progress is not None:
+        progress.reset(stop - start)
+        progress.processed = index - start
+
+    with BufferedDictWriter(output_file, append=resumed, buffer_size=buffer_size,
+                            compression=compression, compression_level=compression_level) as f:
+        flushed = index
+        for data, count in iter_output_chunks(spec, output_type, hash_algo, start_pos, segment_length,
+                                              index, stop):
+            if stop_check and stop_check():
+                break
+
+            f.write(data)
+
+            index += count
+            if progress is not None:
+                progress.processed = index - start
+            if index - flushed >= checkpoint_interval:
+                f.flush()
+                checkpoint.update(index, f.tell())
+                flushed = index
+
+        f.flush()
+        checkpoint.update(index, f.tell())
+
+    if progress is not None:
+        progress.processed = index - start
+    if index >= stop:
+        checkpoint.remove()
+    return index - start
+
+
+def parse_index_range(text, total):
+    """解析 "START:STOP" 形式的序号范围（STOP 不含，可省略任意一端）"""
+    if not text:
+        return 0, total
+    start_text, _, stop_text = text.partition(':')
+    start = int(start_text) if start_text else 0
+    stop = int(stop_text) if stop_text else total
+    return start, min(stop, total)
+
+
+def benchmark_output(spec, output_type="hash", hash_algo="MD5", start_pos=0, segment_length=8,
+                     count=200000):
+    """比较几种输出处理方式的吞吐量（个/秒），返回 [(名称, 吞吐量)]"""
+    count = min(count, spec.total_combinations())
+    passwords = list(spec.iter_range(0, count))
+    transform = compile_output_transform(output_type, hash_algo, start_pos, segment_length)
+    apply = transform.apply
+
+    def per_call():
+        for password in passwords:
+            process_password(password, output_type, hash_algo, start_pos, segment_length)
+
+    def compiled():
+        for password in passwords:
+            apply(password)
+
+    def batched():
+        for offset in range(0, count, OUTPUT_CHUNK_ROWS):
+            transform.apply_batch(passwords[offset:offset + OUTPUT_CHUNK_ROWS])
+
+    def grouped():
+        # 包含候选生成本身，哈希输出时复用前缀的中间状态
+        for _ in iter_output_batches(spec, transform, 0, count):
+            pass
+
+    results = []
+    for name, func in (("process_password", per_call), ("编译变换 apply", compiled),
+                       ("批量 apply_batch", batched), ("生成 + 前缀中间状态", grouped)):
+        begin = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - begin
+        results.append((name, count / elapsed if elapsed > 0 else 0.0))
+    return results
+
+
+def main(argv=None):
+    """命令行入口：无界面生成密码字典"""
+    parser = argparse.ArgumentParser(description="高级密码生成器 - 命令行版本")
+    parser.add_argument('--core', default="4", choices=CORE_TYPES,
+                        help="密码类型：空值、1-8位数字、月日、日月、年月日(YYYYMMDD)、短年月日(YYMMDD)、月日年(MMDDYYYY)")
+    parser.add_argument('--year-range', default=None,
+                        help=f"含年份的日期核心的年份范围，如 1980-2005（默认 {DEFAULT_YEAR_RANGE[0]}-{DEFAULT_YEAR_RANGE[1]}）")
+    parser.add_argument('--mask', default=None,
+                        help="hashcat 风格的掩码（如 ?u?l?l?l?d?d?d?d），指定后代替 --core 作为密码核心")
+    for number in range(1, 5):
+        parser.add_argument(f'-{number}', f'--custom-charset{number}', default='',
+                            help=f"掩码中 ?{number} 使用的自定义字符集，如 ?l?d")
+    parser.add_argument('--increment-min', type=int, default=None, help="掩码增量模式的最小长度")
+    parser.add_argument('--increment-max', type=int, default=None, help="掩码增量模式的最大长度")
+    parser.add_argument('--prefix', action='append', default=[],
+                        help="前缀选项，可多次指定；用 | 分隔多个候选，或使用 {0..9999}、[A-Z] 形式的范围记号")
+    parser.add_argument('--suffix', action='append', default=[],
+                        help="后缀选项，可多次指定；用 | 分隔多个候选，或使用 {0..9999}、[A-Z] 形式的范围记号")
+    parser.add_argument('--order', default="lexicographic", choices=["lexicographic", "frequency", "markov"],
+                        help="候选顺序：字典序、按位置频率或一阶马尔可夫概率（后两者需要 --train）")
+    parser.add_argument('--train', default=None, help="训练排序模型的参考字典（支持 .gz/.xz/.zst）")
+    parser.add_argument('--train-max', type=int, default=None, help="训练时最多读取的参考词数量")
+    parser.add_argument('--output-type', default="original", choices=["original", "hash"])
+    parser.add_argument('--hash', dest='hash_algo', default="MD5", choices=["MD5", "SHA1", "SHA256", "SM3"])
+    parser.add_argument('--start-pos', type=int, default=0)
+    parser.add_argument('--segment-length', type=int, default=8)
+    parser.add_argument('-o', '--output', default="password_dict.txt", help="输出文件")
+    parser.add_argument('--workers', type=int, default=1, help="并行进程数（大于1时使用多进程分片生成）")
+    parser.add_argument('--shard-size', type=int, default=None, help="每个分片的候选数量")
+    parser.add_argument('--per-shard', action='store_true', help="每个分片单独输出一个文件")
+    parser.add_argument('--buffer-mb', type=float, default=DEFAULT_BUFFER_SIZE / (1024 * 1024),
+                        help="写入缓冲区大小（MB）")
+    parser.add_argument('--compress', default="auto", choices=["auto"] + available_compressions(),
+                        help="输出压缩格式，auto 表示按输出文件扩展名（.gz/.xz/.zst）决定")
+    parser.add_argument('--compress-level', type=int, default=None, help="压缩级别")
+    parser.add_argument('--range', dest='index_range', default=None,
+                        help="只生成序号范围 START:STOP（STOP 不含），用于多台机器分工")
+    parser.add_argument('--resume', action='store_true', help="从断点文件继续上次未完成的生成")
+    parser.add_argument('--count', action='store_true', help="只输出总组合数，不生成")
+    parser.add_argument('--at', type=int, default=None, help="只输出指定序号的候选密码")
+    parser.add_argument('--benchmark', type=int, default=None, metavar='N',
+                        help="用前 N 个候选测试输出处理的吞吐量，不生成")
+    args = parser.parse_args(argv)
+    if args.order != "lexicographic" and not args.train:
+        parser.error("--order frequency/markov 需要用 --train 指定参考字典")
+
+    prefix_options = [parse_option_text(value) for value in args.prefix]
+    suffix_options = [parse_option_text(value) for value in args.suffix]
+    if args.mask:
+        from password_mask import MaskSpec
+        spec = MaskSpec(
+            args.mask,
+            [args.custom_charset1, args.custom_charset2, args.custom_charset3, args.custom_charset4],
+            min_length=args.increment_min,
+            max_length=args.increment_max,
+            prefix_options=prefix_options,
+            suffix_options=suffix_options,
+        )
+    else:
+        spec = PasswordSpec(
+            prefix_options=prefix_options,
+            core_type=args.core,
+            suffix_options=suffix_options,
+            year_range=parse_year_range(args.year_range) if args.year_range else None,
+        )
+
+    if args.count:
+        if args.mask:
+            # 增量模式下同时列出各长度的候选数
+            for length, _, count in spec.segments():
+                print(f"{length} 位: {count}")
+        print(spec.total_combinations())
+        return 0
+    if args.order != "lexicographic":
+        # 排序只改变顺序，不影响总数，因此在 --count 之后再训练模型
+        from candidate_order import apply_order, DEFAULT_TRAIN_WORDS
+        spec = apply_order(spec, args.order, args.train, args.train_max or DEFAULT_TRAIN_WORDS)
+    if args.at is not None:
+        print(spec.candidate_at(args.at))
+        return 0
+    if args.benchmark is not None:
+        for name, rate in benchmark_output(spec, args.output_type, args.hash_algo, args.start_pos,
+                                           args.segment_length, args.benchmark):
+            print(f"{name}: {rate:,.0f} 个/秒")
+        return 0
+
+    start, stop = parse_index_range(args.index_range, spec.total_combinations())
+    buffer_size = int(args.buffer_mb * 1024 * 1024)
+    if args.workers > 1 or args.per_shard:
+        from parallel_generator import generate_parallel, DEFAULT_SHARD_SIZE
+        processed = generate_parallel(
+            spec, args.output, args.output_type, args.hash_algo, args.start_pos,
+            args.segment_length, workers=args.workers,
+            shard_size=args.shard_size or DEFAULT_SHARD_SIZE, per_shard_files=args.per_shard,
+            start=start, stop=stop, resume=args.resume, buffer_size=buffer_size,
+            compression=args.compress, compression_level=args.compress_level)
+    else:
+        processed = generate_dictionary(
+            spec, args.output, args.output_type, args.hash_algo, args.start_pos,
+            args.segment_length, start=start, stop=stop, resume=args.resume,
+            buffer_size=buffer_size, compression=args.compress, compression_level=args.compress_level)
+
+    print(f"完成！共生成 {processed} 个{spec.describe()}，保存到: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+hashcat 风格的掩码
+
+    ?l  小写字母 a-z            ?u  大写字母 A-Z            ?d  数字 0-9
+    ?h  0-9a-f                  ?H  0-9A-F                  ?s  特殊字符（含空格）
+    ?a  ?l?u?d?s                ?1 - ?4  自定义字符集       ??  字面量 '?'
+    其他字符按字面量处理
+
+例如 ?u?l?l?l?d?d?d?d 表示首字母大写、三个小写字母加四位数字。自定义字符集用
+-1 ?l?d 的方式定义，定义中同样可以使用内置字符集和字面量字符。
+
+掩码的每个位置是一组候选字符，与前缀、后缀一起组成和 PasswordSpec 相同的位置列表，
+因此同样可以按序号取值、分片并行和断点续传。启用增量长度时依次生成掩码前 min..max
+个位置的密码空间（从短到长首尾相接），总数在生成前即可精确算出。
+"""
+
+import json
+
+from option_tokens import options_signature
+from password_engine import combo_at, iter_grouped_positions, iter_positions, normalize_options
+
+# 掩码作为密码类型时的名称
+CORE_MASK = "掩码"
+
+LOWER = "abcdefghijklmnopqrstuvwxyz"
+UPPER = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+DIGITS = "0123456789"
+SPECIAL = " !\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~"
+
+BUILTIN_CHARSETS = {
+    'l': LOWER,
+    'u': UPPER,
+    'd': DIGITS,
+    'h': DIGITS + "abcdef",
+    'H': DIGITS + "ABCDEF",
+    's': SPECIAL,
+    'a': LOWER + UPPER + DIGITS + SPECIAL,
+}
+
+# 自定义字符集数量（?1 - ?4）
+CUSTOM_CHARSET_COUNT = 4
+
+
+def _expand(text, custom_charsets, allow_custom):
+    """把掩码文本拆分为字符集列表，每个元素为该位置的候选字符（字符串）"""
+    positions = []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char != '?':
+            positions.append(char)
+            i += 1
+            continue
+        if i + 1 >= len(text):
+            raise ValueError(f"掩码以单独的 '?' 结尾: {text}")
+        key = text[i + 1]
+        if key in BUILTIN_CHARSETS:
+            positions.append(BUILTIN_CHARSETS[key])
+        elif key == '?':
+            positions.append('?')
+        elif key.isdigit() and 1 <= int(key) <= CUSTOM_CHARSET_COUNT:
+            if not allow_custom:
+                raise ValueError(f"自定义字符集中不能引用 ?{key}")
+            charset = custom_charsets[int(key) - 1]
+            if not charset:
+                raise ValueError(f"掩码使用了未定义的自定义字符集 ?{key}")
+            positions.append(charset)
+        else:
+            raise ValueError(f"不支持的掩码字符集: ?{key}")
+        i += 2
+    return positions
+
+
+def parse_charset(text):
+    """解析自定义字符集定义（如 ?l?d、abc?d），返回去重后保持顺序的字符串"""
+    return ''.join(dict.fromkeys(''.join(_expand(text, (), allow_custom=False))))
+
+
+def parse_mask(mask, custom_charsets=()):
+    """把掩码解析为位置列表；custom_charsets 为已展开的自定义字符集（可少于 4 个）"""
+    charsets = list(custom_charsets) + [''] * (CUSTOM_CHARSET_COUNT - len(custom_charsets))
+    positions = _expand(mask, charsets, allow_custom=True)
+    if not positions:
+        raise ValueError("掩码不能为空")
+    return positions
+
+
+def parse_mask_text(text):
+    """解析界面输入的掩码文本，如 "-1 ?l?d ?u?1?1?1?d?d"
+
+    返回 (掩码, 自定义字符集定义列表)，定义列表为 4 个原始文本（未定义时为空字符串）。
+    只按空白拆分，引号和反斜杠都是掩码中的字面量字符。
+    """
+    parts = text.split()
+    definitions = [''] * CUSTOM_CHARSET_COUNT
+    masks = []
+    i = 0
+    while i < len(parts):
+        part = parts[i]
+        if len(part) == 2 and part[0] == '-' and part[1].isdigit() and 1 <= int(part[1]) <= CUSTOM_CHARSET_COUNT:
+            if i + 1 >= len(parts):
+                raise ValueError(f"自定义字符集 {part} 缺少定义")
+            definitions[int(part[1]) - 1] = parts[i + 1]
+            i += 2
+        else:
+            masks.append(part)
+            i += 1
+    if len(masks) != 1:
+        raise ValueError("请输入一个掩码，如 ?u?l?l?l?d?d?d?d")
+    return masks[0], definitions
+
+
+def parse_length_range(text, mask_length):
+    """解析增量长度 "6-8"（或单个数字 "6" 表示 6 到掩码长度）；空文本表示只生成完整长度"""
+    text = text.strip()
+    if not text:
+        return None, None
+    start_text, sep, stop_text = text.replace(':', '-').partition('-')
+    try:
+        min_length = int(start_text)
+        max_length = int(stop_text) if sep and stop_text.strip() else mask_length
+    except ValueError:
+        raise ValueError(f"长度范围格式应为 最小长度-最大长度: {text}")
+    return min_length, max_length
+
+
+class MaskSpec:
+    """掩码密码空间：前缀 + 掩码（可按长度递增）+ 后缀
+
+    接口与 PasswordSpec 相同（total_combinations、iter_range、iter_grouped、candidate_at、
+    signature、describe），可以直接交给生成、并行生成和边生成边解密使用。
+    """
+
+    core_type = CORE_MASK
+
+    def __init__(self, mask, custom_charsets=None, min_length=None, max_length=None,
+                 prefix_options=None, suffix_options=None):
+        definitions = list(custom_charsets or [])
+        if len(definitions) > CUSTOM_CHARSET_COUNT:
+            raise ValueError(f"最多支持 {CUSTOM_CHARSET_COUNT} 个自定义字符集")
+        self.mask = mask
+        self.custom_charsets = definitions + [''] * (CUSTOM_CHARSET_COUNT - len(definitions))
+        self.mask_positions = parse_mask(mask, [parse_charset(text) for text in self.custom_charsets])
+        self.prefix_options = [normalize_options(options) for options in (prefix_options or [[""]])]
+        self.suffix_options = [normalize_options(options) for options in (suffix_options or [[""]])]
+
+        mask_length = len(self.mask_positions)
+        if min_length is None and max_length is None:
+            min_length = max_length = mask_length
+        min_length = 1 if min_length is None else int(min_length)
+        max_length = mask_length if max_length is None else int(max_length)
+        if not 1 <= min_length <= max_length <= mask_length:
+            raise ValueError(f"长度范围无效: {min_length}-{max_length}（掩码共 {mask_length} 位）")
+        self.min_length = min_length
+        self.max_length = max_length
+
+    def is_date_core(self):
+        return False
+
+    def lengths(self):
+        return range(self.min_length, self.max_length + 1)
+
+    def positions_for(self, length):
+        """长度为 length 的掩码对应的完整位置列表"""
+        return self.prefix_options + self.mask_positions[:length] + self.suffix_options
+
+    def segments(self):
+        """返回 [(掩码长度, 起始序号, 候选数)]，按长度从短到长首尾相接"""
+        segments = []
+        offset = 0
+        for length in self.lengths():
+            count = 1
+            for options in self.positions_for(length):
+                count *= len(options)
+            segments.append((length, offset, count))
+            offset += count
+        return segments
+
+    def position_segments(self):
+        """返回 [(起始序号, 候选数, 位置列表)]，每个长度一段"""
+        return [(offset, count, self.positions_for(length)) for length, offset, count in self.segments()]
+
+    def total_combinations(self):
+        return sum(count for _, _, count in self.segments())
+
+    def describe(self):
+        if self.min_length == self.max_length:
+            return f"掩码 {self.mask} 密码"
+        return f"掩码 {self.mask}（{self.min_length}-{self.max_length} 位）密码"
+
+    def __len__(self):
+        return self.total_combinations()
+
+    def __iter__(self):
+        yield from self.iter_range(0, self.total_combinations())
+
+    def _overlapping(self, start, stop):
+        """产生与 [start, stop) 相交的各段 (长度, 段内起点, 段内终点)"""
+        for length, offset, count in self.segments():
+            lo = max(start, offset)
+            hi = min(stop, offset + count)
+            if lo < hi:
+                yield length, lo - offset, hi - offset
+
+    def iter_range(self, start, stop):
+        for length, lo, hi in self._overlapping(start, stop):
+            yield from iter_positions(self.positions_for(length), lo, hi)
+
+    def iter_grouped(self, start=0, stop=None):
+        """按前缀分组产生候选，见 PasswordSpec.iter_grouped"""
+        if stop is None:
+            stop = self.total_combinations()
+        for length, lo, hi in self._overlapping(start, stop):
+            tail_positions = self.mask_positions[:length] + self.suffix_options
+            yield from iter_grouped_positions(self.prefix_options, tail_positions, lo, hi)
+
+    def candidate_at(self, index):
+        total = self.total_combinations()
+        if index < 0:
+            index += total
+        if not 0 <= index < total:
+            raise IndexError(f"序号超出范围: {index} (共 {total} 个)")
+        for length, offset, count in self.segments():
+            if index < offset + count:
+                return combo_at(self.positions_for(length), index - offset)
+
+    def signature(self):
+        """返回描述密码空间的字符串，用于校验断点文件是否属于同一任务"""
+        parts = [[options_signature(options) for options in self.prefix_options], CORE_MASK,
+                 [options_signature(options) for options in self.suffix_options],
+                 self.mask, self.custom_charsets, self.min_length, self.max_length]
+        return json.dumps(parts, ensure_ascii=False)
+
+
+def mask_from_text(text, length_text="", prefix_options=None, suffix_options=None):
+    """根据界面输入（掩码文本、长度范围）构建 MaskSpec"""
+    mask, definitions = parse_mask_text(text)
+    mask_length = len(parse_mask(mask, [parse_charset(definition) for definition in definitions]))
+    min_length, max_length = parse_length_range(length_text, mask_length)
+    return MaskSpec(mask, definitions, min_length, max_length, prefix_options, suffix_options)
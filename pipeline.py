@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+边生成边解密
+
+生成线程按块产生候选并放入有界队列，解密端直接从队列取出候选验证，不再先写完整个
+字典文件再重新读取；可选把候选同时写入字典文件（tee）。
+"""
+
+import queue
+import threading
+
+from dict_io import BufferedDictWriter, resolve_compression
+from password_engine import iter_outputs
+
+# 每个队列元素包含的候选数量
+PIPELINE_BATCH_SIZE = 1024
+
+# 队列中最多缓存的批次数量（有界队列，生成端不会无限领先于解密端）
+PIPELINE_QUEUE_SIZE = 64
+
+_END = object()
+
+
+class CandidatePipeline:
+    """生成端与解密端之间的有界候选队列
+
+    start() 启动生成线程；迭代本对象即可按顺序取出候选。close() 通知生成线程停止。
+    consumed / total 可用于计算进度。
+    """
+
+    def __init__(self, spec, output_type="original", hash_algo="MD5", start_pos=0, segment_length=8,
+                 tee_file=None, batch_size=PIPELINE_BATCH_SIZE, queue_size=PIPELINE_QUEUE_SIZE):
+        self.spec = spec
+        self.output_type = output_type
+        self.hash_algo = hash_algo
+        self.start_pos = start_pos
+        self.segment_length = segment_length
+        self.tee_file = tee_file
+        self.batch_size = batch_size
+        self.total = spec.total_combinations()
+        self.consumed = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+        return self
+
+    def _put(self, item):
+        """放入队列；解密端已结束时放弃"""
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        writer = None
+        try:
+            if self.tee_file:
+                writer = BufferedDictWriter(self.tee_file, compression=resolve_compression(self.tee_file))
+            batch = []
+            for result in iter_outputs(self.spec, self.output_type, self.hash_algo,
+                                       self.start_pos, self.segment_length):
+                batch.append(result)
+                if len(batch) >= self.batch_size:
+                    if writer is not None:
+                        writer.write(('\n'.join(batch) + '\n').encode('utf-8'))
+                    if not self._put(batch):
+                        return
+                    batch = []
+            if batch:
+                if writer is not None:
+                    writer.write(('\n'.join(batch) + '\n').encode('utf-8'))
+                self._put(batch)
+        except Exception as e:
+            self.error = e
+        finally:
+            if writer is not None:
+                writer.close()
+            self._put(_END)
+
+    def fraction(self):
+        if not self.total:
+            return 1.0
+        return min(self.consumed / self.total, 1.0)
+
+    def __iter__(self):
+        while True:
+            batch = self._queue.get()
+            if batch is _END:
+                if self.error is not None:
+                    raise self.error
+                return
+            for candidate in batch:
+                self.consumed += 1
+                yield candidate
+
+    def close(self):
+        """通知生成线程停止并等待其退出"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def generate_and_decrypt(decryptor, encrypted_file, spec, output_type="original", hash_algo="MD5",
+                         start_pos=0, segment_length=8, tee_file=None):
+    """生成候选并直接交给解密器验证，返回找到的密码或 None"""
+    with CandidatePipeline(spec, output_type, hash_algo, start_pos, segment_length,
+                           tee_file=tee_file) as pipeline:
+        return decryptor.decrypt_candidates(encrypted_file, pipeline, pipeline.fraction)
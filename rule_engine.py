@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+字典规则变形
+
+对已有字典中的每个基础词应用一组规则（语法与 hashcat 规则兼容的子集），流式产生变形后的
+候选，用少量精选词扩增出大量候选，不必生成和保存完整的暴力密码空间。
+
+    :    原样              l    全部小写          u    全部大写
+    c    首字母大写        C    首字母小写其余大写 t    大小写互换
+    TN   切换第 N 位大小写 r    反转              d    重复
+    f    追加反转          {    循环左移          }    循环右移
+    [    删除首字符        ]    删除末字符        $X   末尾追加 X
+    ^X   开头插入 X        sXY  把 X 替换为 Y     @X   删除所有 X
+
+一条规则由若干操作依次组成（如 c$1$2），操作之间可以有空格。每条规则预先编译为一个
+函数：单个操作直接使用对应的 str 方法，连续的追加/插入合并为一次拼接，连续的替换/删除
+合并为一张 str.translate 转换表。同一个词在各规则下产生的重复结果只保留一个。
+多进程时按词块分发给进程池，结果按原顺序合并。
+"""
+
+import argparse
+import itertools
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from dict_io import BufferedDictWriter, DictReader, DEFAULT_BUFFER_SIZE, resolve_compression
+from password_engine import compile_output_transform
+
+# 每个任务包含的基础词数量
+DEFAULT_CHUNK_WORDS = 4096
+
+# 位置参数：0-9 表示 0-9，A-Z 表示 10-35
+POSITION_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# 各操作的参数个数
+RULE_ARITY = {
+    ':': 0, 'l': 0, 'u': 0, 'c': 0, 'C': 0, 't': 0, 'r': 0, 'd': 0, 'f': 0,
+    '{': 0, '}': 0, '[': 0, ']': 0,
+    'T': 1, '$': 1, '^': 1, '@': 1,
+    's': 2,
+}
+
+
+def _digit_rules(command, width):
+    """产生追加（$）或插入（^）width 位数字的全部规则"""
+    rules = []
+    for digits in itertools.product("0123456789", repeat=width):
+        if command == '^':
+            # 插入操作依次放到开头，需要倒序才能得到原顺序的数字
+            digits = reversed(digits)
+        rules.append(''.join(command + digit for digit in digits))
+    return rules
+
+
+# 预置规则组
+RULE_PRESETS = {
+    "原词": [":"],
+    "首字母大写": ["c"],
+    "大小写互换": ["t"],
+    "Leet 替换": ["sa@", "se3", "si1", "so0", "ss$", "sa@se3si1so0", "sa4se3si1so0ss5st7"],
+    "反转": ["r"],
+    "重复": ["d"],
+    "末尾追加数字": _digit_rules('$', 1) + _digit_rules('$', 2),
+    "开头追加数字": _digit_rules('^', 1) + _digit_rules('^', 2),
+    "首字母大写并追加数字": ['c' + rule for rule in _digit_rules('$', 1) + _digit_rules('$', 2)],
+}
+
+
+def preset_rules(names):
+    """按名称合并预置规则组（去重并保持顺序）"""
+    rules = []
+    for name in names:
+        if name not in RULE_PRESETS:
+            raise ValueError(f"未知的规则组: {name}")
+        rules.extend(RULE_PRESETS[name])
+    return list(dict.fromkeys(rules))
+
+
+def load_rule_file(path):
+    """读取规则文件：每行一条规则，忽略空行和 # 开头的注释"""
+    rules = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if line.strip() and not line.lstrip().startswith('#'):
+                rules.append(line)
+    return rules
+
+
+def parse_rule(rule):
+    """把规则文本解析为 [(操作, 参数...)]；格式错误时抛出 ValueError"""
+    ops = []
+    i = 0
+    while i < len(rule):
+        command = rule[i]
+        if command == ' ':
+            i += 1
+            continue
+        if command not in RULE_ARITY:
+            raise ValueError(f"不支持的规则操作 '{command}': {rule}")
+        arity = RULE_ARITY[command]
+        args = rule[i + 1:i + 1 + arity]
+        if len(args) != arity:
+            raise ValueError(f"规则操作 '{command}' 缺少参数: {rule}")
+        if command == 'T':
+            if args not in POSITION_CHARS:
+                raise ValueError(f"无效的位置参数 '{args}': {rule}")
+            args = POSITION_CHARS.index(args)
+        ops.append((command, args))
+        i += 1 + arity
+    return ops
+
+
+def _toggle_at(position):
+    def toggle(word):
+        if position >= len(word):
+            return word
+        return word[:position] + word[position].swapcase() + word[position + 1:]
+    return toggle
+
+
+# 无参数操作对应的函数
+_SIMPLE_STEPS = {
+    'l': str.lower,
+    'u': str.upper,
+    'c': str.capitalize,
+    'C': lambda word: word[:1].lower() + word[1:].upper(),
+    't': str.swapcase,
+    'r': lambda word: word[::-1],
+    'd': lambda word: word + word,
+    'f': lambda word: word + word[::-1],
+    '{': lambda word: word[1:] + word[:1],
+    '}': lambda word: word[-1:] + word[:-1],
+    '[': lambda word: word[1:],
+    ']': lambda word: word[:-1],
+}
+
+
+def _compile_steps(ops):
+    """把操作序列编译为函数列表，合并连续的追加、插入和替换"""
+    steps = []
+    i = 0
+    while i < len(ops):
+        command, args = ops[i]
+        if command == ':':
+            i += 1
+        elif command == '$' or command == '^':
+            text = ''
+            while i < len(ops) and ops[i][0] == command:
+                text = text + ops[i][1] if command == '$' else ops[i][1] + text
+                i += 1
+            if command == '$':
+                steps.append(lambda word, text=text: word + text)
+            else:
+                steps.append(lambda word, text=text: text + word)
+        elif command == 's' or command == '@':
+            # 逐个替换的结果等价于一张合成后的转换表
+            table = {}
+            while i < len(ops) and ops[i][0] in ('s', '@'):
+                source = ops[i][1][0]
+                target = ops[i][1][1] if ops[i][0] == 's' else None
+                for key, value in table.items():
+                    if value == source:
+                        table[key] = target
+                table.setdefault(source, target)
+                i += 1
+            table = str.maketrans({key: value for key, value in table.items() if key != value})
+            steps.append(lambda word, table=table: word.translate(table))
+        elif command == 'T':
+            steps.append(_toggle_at(args))
+            i += 1
+        else:
+            steps.append(_SIMPLE_STEPS[command])
+            i += 1
+    return steps
+
+
+def compile_rule(rule):
+    """把一条规则编译为 word -> word 的函数"""
+    steps = _compile_steps(parse_rule(rule))
+    if not steps:
+        return str
+    if len(steps) == 1:
+        return steps[0]
+
+    def apply(word):
+        for step in steps:
+            word = step(word)
+        return word
+    return apply
+
+
+class RuleSet:
+    """编译好的一组规则"""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        if not self.rules:
+            raise ValueError("规则列表为空")
+        self._functions = [compile_rule(rule) for rule in self.rules]
+
+    def __len__(self):
+        return len(self.rules)
+
+    def apply(self, word):
+        """返回 word 在各规则下的结果（按规则顺序，去除重复和空结果）"""
+        return [result for result in dict.fromkeys(function(word) for function in self._functions) if result]
+
+    def apply_batch(self, words):
+        """对一批基础词应用全部规则，按 词 → 规则 的顺序返回结果列表"""
+        functions = self._functions
+        results = []
+        extend = results.extend
+        for word in words:
+            extend(result for result in dict.fromkeys(function(word) for function in functions) if result)
+        return results
+
+
+def count_words(dict_path):
+    """统计字典中的基础词数量（流式读取）"""
+    with DictReader(dict_path) as reader:
+        return sum(1 for _ in reader)
+
+
+# 子进程中的规则和输出变换，由进程池初始化函数设置
+_worker_rules = None
+_worker_transform = None
+
+
+def _init_rule_worker(rules, output_settings):
+    global _worker_rules, _worker_transform
+    _worker_rules = RuleSet(rules)
+    _worker_transform = compile_output_transform(*output_settings)
+
+
+def _mangle_chunk(words):
+    """对一块基础词应用规则，返回 (以换行分隔的 UTF-8 字节串, 条数)"""
+    results = _worker_transform.apply_batch(_worker_rules.apply_batch(words))
+    if not results:
+        return b'', 0
+    return ('\n'.join(results) + '\n').encode('utf-8'), len(results)
+
+
+class RuleMangler:
+    """流式读取基础字典并应用规则
+
+    iter_chunks() 按原顺序产生 (字节块, 条数, 已处理基础词数)；迭代本对象逐个产生候选，
+    可直接交给 FileDecryptor.decrypt_candidates()。fraction() 按已读取的字典字节数估算进度。
+    workers 大于 1 时由进程池处理各词块。
+    """
+
+    def __init__(self, dict_path, rules, workers=1, chunk_words=DEFAULT_CHUNK_WORDS,
+                 output_type="original", hash_algo="MD5", start_pos=0, segment_length=8):
+        self.dict_path = dict_path
+        self.rules = list(rules)
+        RuleSet(self.rules)  # 提前检查规则格式
+        self.workers = max(int(workers), 1)
+        self.chunk_words = max(int(chunk_words), 1)
+        self.output_settings = (output_type, hash_algo, start_pos, segment_length)
+        self._reader = DictReader(dict_path)
+
+    def fraction(self):
+        return self._reader.fraction()
+
+    def _word_chunks(self):
+        words = iter(self._reader)
+        while True:
+            chunk = list(itertools.islice(words, self.chunk_words))
+            if not chunk:
+                return
+            yield chunk
+
+    def iter_chunks(self, stop_check=None):
+        words_done = 0
+        if self.workers == 1:
+            _init_rule_worker(self.rules, self.output_settings)
+            for chunk in self._word_chunks():
+                if stop_check and stop_check():
+                    return
+                data, count = _mangle_chunk(chunk)
+                words_done += len(chunk)
+                yield data, count, words_done
+            return
+
+        # 限制在途任务数量，保证内存占用有上限
+        max_pending = self.workers * 2
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_rule_worker,
+                                 initargs=(self.rules, self.output_settings)) as executor:
+            pending = []
+            chunks = self._word_chunks()
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < max_pending:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                        break
+                    pending.append((len(chunk), executor.submit(_mangle_chunk, chunk)))
+
+                if not pending:
+                    break
+                if stop_check and stop_check():
+                    for _, future in pending:
+                        future.cancel()
+                    return
+
+                # 按提交顺序取回结果，保证输出顺序
+                size, future = pending.pop(0)
+                data, count = future.result()
+                words_done += size
+                yield data, count, words_done
+
+    def __iter__(self):
+        for data, count, _ in self.iter_chunks():
+            if count:
+                yield from data.decode('utf-8').split('\n')[:count]
+
+    def close(self):
+        self._reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def mangle_dictionary(dict_path, rules, output_file, workers=1, output_type="original", hash_algo="MD5",
+                      start_pos=0, segment_length=8, progress=None, stop_check=None,
+                      buffer_size=DEFAULT_BUFFER_SIZE, compression=None, compression_level=None):
+    """把基础字典经规则变形后写入 output_file，返回写入的候选数量
+
+    progress 为 GenerationProgress（可选）：已处理数按 已处理基础词数 × 规则数 换算，总数按已读取的
+    字典字节比例估算（不预先统计词数，避免多读一遍字典）。compression 为空时按输出文件扩展名决定是否压缩。
+    """
+    if progress is not None:
+        progress.reset(0)
+    compression = resolve_compression(output_file, compression)
+    written = 0
+    with RuleMangler(dict_path, rules, workers, output_type=output_type, hash_algo=hash_algo,
+                     start_pos=start_pos, segment_length=segment_length) as mangler, \
+            BufferedDictWriter(output_file, buffer_size=buffer_size, compression=compression,
+                               compression_level=compression_level) as out:
+        for data, count, words_done in mangler.iter_chunks(stop_check):
+            out.write(data)
+            written += count
+            if progress is not None:
+                processed = words_done * len(rules)
+                fraction = mangler.fraction()
+                if fraction > 0:
+                    progress.total = max(int(processed / fraction), processed)
+                progress.processed = processed
+    return written
+
+
+def main(argv=None):
+    """命令行入口：对已有字典应用规则"""
+    parser = argparse.ArgumentParser(description="字典规则变形")
+    parser.add_argument('dictionary', help="基础字典文件（支持 .gz/.xz/.zst）")
+    parser.add_argument('-p', '--preset', action='append', default=[], choices=list(RULE_PRESETS),
+                        help="预置规则组，可多次指定")
+    parser.add_argument('-r', '--rule', action='append', default=[], help="单条规则，如 c$1，可多次指定")
+    parser.add_argument('--rule-file', action='append', default=[], help="规则文件（每行一条），可多次指定")
+    parser.add_argument('-o', '--output', default="mangled_dict.txt", help="输出文件")
+    parser.add_argument('--workers', type=int, default=1, help="并行进程数")
+    parser.add_argument('--count', action='store_true', help="只输出 基础词数 × 规则数，不生成")
+    args = parser.parse_args(argv)
+
+    rules = preset_rules(args.preset) + args.rule
+    for path in args.rule_file:
+        rules += load_rule_file(path)
+    if not rules:
+        parser.error("请至少指定一个 --preset、--rule 或 --rule-file")
+
+    if args.count:
+        words = count_words(args.dictionary)
+        print(f"{words} 个基础词 × {len(rules)} 条规则 = {words * len(rules)}（去重前）")
+        return 0
+
+    written = mangle_dictionary(args.dictionary, rules, args.output, workers=args.workers)
+    print(f"完成！共生成 {written} 个候选，保存到: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SM3 哈希后端
+
+优先使用 OpenSSL 提供的 SM3（hashlib.new('sm3')，C 实现）；不可用时使用本模块的纯 Python
+实现。纯 Python 实现直接在 32 位整数上运算，预先计算好每轮循环移位后的常量 T_j，
+并与 hashlib 对象一样支持 update() / copy()，可以复用前缀的中间状态。
+
+导入时用标准测试向量（GB/T 32905-2016 附录 A）校验选定的后端：OpenSSL 结果不正确时改用
+纯 Python 实现，纯 Python 实现也不正确时抛出 ValueError，避免错误的摘要写入字典。
+self_test() 另外与 gmssl（如已安装）比对并检查中间状态复制。
+"""
+
+import hashlib
+import struct
+
+
+def _has_hashlib_sm3():
+    """OpenSSL 提供 SM3 时可以通过 hashlib 使用"""
+    try:
+        hashlib.new('sm3', b'')
+        return True
+    except ValueError:
+        return False
+
+
+IV = (0x7380166F, 0x4914B2B9, 0x172442D7, 0xDA8A0600,
+      0xA96F30BC, 0x163138AA, 0xE38DEE4D, 0xB0FB0E4E)
+
+MASK = 0xFFFFFFFF
+
+# 标准测试向量
+TEST_VECTORS = (
+    (b"abc", "66c7f0f462eeedd9d1f2d46bdc10e4e24167c4875cf2f7a2297da02b8f4ba8e0"),
+    (b"abcd" * 16, "debe9ff92275b8a138604889c18e5a4d6fdb70e5387e5765293dcba39c0c5732"),
+)
+
+
+def _rotl(x, n):
+    n %= 32
+    return ((x << n) | (x >> (32 - n))) & MASK
+
+
+# 第 j 轮使用的常量 T_j <<< j
+_T = [_rotl(0x79CC4519 if j < 16 else 0x7A879D8A, j) for j in range(64)]
+
+
+def _compress(v, block):
+    """压缩函数：处理一个 64 字节分组，返回新的 8 个状态字"""
+    w = list(struct.unpack('>16I', block))
+    for j in range(16, 68):
+        x = w[j - 16] ^ w[j - 9] ^ (((w[j - 3] << 15) | (w[j - 3] >> 17)) & MASK)
+        x ^= (((x << 15) | (x >> 17)) ^ ((x << 23) | (x >> 9))) & MASK
+        w.append(x ^ (((w[j - 13] << 7) | (w[j - 13] >> 25)) & MASK) ^ w[j - 6])
+
+    a, b, c, d, e, f, g, h = v
+    t = _T
+    for j in range(64):
+        a12 = ((a << 12) | (a >> 20)) & MASK
+        ss1 = (a12 + e + t[j]) & MASK
+        ss1 = ((ss1 << 7) | (ss1 >> 25)) & MASK
+        ss2 = ss1 ^ a12
+        wj = w[j]
+        if j < 16:
+            tt1 = ((a ^ b ^ c) + d + ss2 + (wj ^ w[j + 4])) & MASK
+            tt2 = ((e ^ f ^ g) + h + ss1 + wj) & MASK
+        else:
+            tt1 = (((a & b) | (a & c) | (b & c)) + d + ss2 + (wj ^ w[j + 4])) & MASK
+            tt2 = (((e & f) | (~e & g)) + h + ss1 + wj) & MASK
+        d = c
+        c = ((b << 9) | (b >> 23)) & MASK
+        b = a
+        a = tt1
+        h = g
+        g = ((f << 19) | (f >> 13)) & MASK
+        f = e
+        e = tt2 ^ (((tt2 << 9) | (tt2 >> 23)) & MASK) ^ (((tt2 << 17) | (tt2 >> 15)) & MASK)
+
+    return (v[0] ^ a, v[1] ^ b, v[2] ^ c, v[3] ^ d, v[4] ^ e, v[5] ^ f, v[6] ^ g, v[7] ^ h)
+
+
+class SM3:
+    """纯 Python SM3，接口与 hashlib 对象相同"""
+
+    name = "sm3"
+    digest_size = 32
+    block_size = 64
+
+    def __init__(self, data=b''):
+        self._state = IV
+        self._buffer = b''
+        self._length = 0
+        if data:
+            self.update(data)
+
+    def update(self, data):
+        data = self._buffer + bytes(data)
+        self._length += len(data) - len(self._buffer)
+        state = self._state
+        end = len(data) - len(data) % 64
+        for offset in range(0, end, 64):
+            state = _compress(state, data[offset:offset + 64])
+        self._state = state
+        self._buffer = data[end:]
+
+    def copy(self):
+        other = SM3.__new__(SM3)
+        other._state = self._state
+        other._buffer = self._buffer
+        other._length = self._length
+        return other
+
+    def digest(self):
+        # 填充：0x80，补零到 56 字节（模 64），最后 8 字节为消息比特长度
+        tail = self._buffer + b'\x80'
+        tail += b'\x00' * ((56 - len(tail)) % 64)
+        tail += struct.pack('>Q', self._length * 8)
+        state = self._state
+        for offset in range(0, len(tail), 64):
+            state = _compress(state, tail[offset:offset + 64])
+        return struct.pack('>8I', *state)
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+
+def _known_answers_ok(factory):
+    """factory(data) 返回的哈希对象是否符合标准测试向量"""
+    return all(factory(message).hexdigest() == expected for message, expected in TEST_VECTORS)
+
+
+def _select_backend():
+    """选择通过已知答案校验的后端；返回是否使用 hashlib"""
+    if _has_hashlib_sm3() and _known_answers_ok(lambda data: hashlib.new('sm3', data)):
+        return True
+    if not _known_answers_ok(SM3):
+        raise ValueError("SM3 自检失败：OpenSSL 和纯 Python 实现均不符合标准测试向量")
+    return False
+
+
+HASHLIB_SM3 = _select_backend()
+
+
+def new(data=b''):
+    """创建 SM3 哈希对象：OpenSSL 可用时使用 hashlib，否则使用纯 Python 实现"""
+    if HASHLIB_SM3:
+        return hashlib.new('sm3', data)
+    return SM3(data)
+
+
+def sm3_hex(data):
+    """返回 data 的 SM3 十六进制摘要"""
+    return new(data).hexdigest()
+
+
+def self_test():
+    """校验当前后端和纯 Python 实现；结果不正确时抛出 ValueError"""
+    samples = [message for message, _ in TEST_VECTORS] + [b"", b"password123", bytes(range(256)) * 3]
+    for message, expected in TEST_VECTORS:
+        for name, actual in (("sm3_fast", sm3_hex(message)), ("SM3", SM3(message).hexdigest())):
+            if actual != expected:
+                raise ValueError(f"SM3 自检失败（{name}）: {message!r}")
+
+    try:
+        from gmssl import sm3 as gmssl_sm3
+    except ImportError:
+        gmssl_sm3 = None
+    if gmssl_sm3 is not None:
+        for message in samples:
+            expected = gmssl_sm3.sm3_hash(bytearray(message))
+            if sm3_hex(message) != expected or SM3(message).hexdigest() != expected:
+                raise ValueError(f"SM3 自检失败（与 gmssl 不一致）: {message!r}")
+
+    # 中间状态复制后继续计算应与一次性计算结果相同
+    base = new(b"prefix-")
+    copied = base.copy()
+    copied.update(b"tail")
+    if copied.hexdigest() != sm3_hex(b"prefix-tail"):
+        raise ValueError("SM3 自检失败（copy）")
+    return True
+
+
+if __name__ == "__main__":
+    import time
+
+    self_test()
+    print(f"SM3 自检通过，后端: {'hashlib (OpenSSL)' if HASHLIB_SM3 else '纯 Python'}")
+
+    count = 20000
+    for label, factory in (("当前后端", new), ("纯 Python", SM3)):
+        start = time.perf_counter()
+        for i in range(count):
+            factory(str(i).encode()).hexdigest()
+        elapsed = time.perf_counter() - start
+        print(f"{label}: {count / elapsed:,.0f} 个/秒")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基于 NumPy 的批量核心生成（原始密码输出模式）
+
+把数字核心、日期核心或掩码按块生成为定宽字节矩阵，再通过广播拼接前缀、后缀和换行符，
+直接得到可写入文件的字节块，不再为每个候选创建元组和字符串。
+未安装 NumPy 或密码空间不满足定宽条件时，调用方应回退到逐个生成的方式。
+"""
+
+import itertools
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from password_engine import CORE_EMPTY, combo_at
+from candidate_order import OrderedSpec
+from password_mask import MaskSpec
+
+# 每块生成的行数
+DEFAULT_CHUNK_ROWS = 1 << 20
+
+# 后缀组合数超过该值时不使用批量路径（需要预先展开全部后缀组合）
+MAX_SUFFIX_COMBINATIONS = 4096
+
+NEWLINE = 10
+
+
+def is_available():
+    return np is not None
+
+
+def _suffix_strings(spec):
+    """展开全部后缀组合；组合过多时返回 None"""
+    total = 1
+    for options in spec.suffix_options:
+        total *= len(options)
+    if total > MAX_SUFFIX_COMBINATIONS:
+        return None
+    return [''.join(combo).encode('utf-8') for combo in itertools.product(*spec.suffix_options)]
+
+
+def supports(spec):
+    """判断密码空间能否走批量路径：需要 NumPy、非空核心且所有后缀组合等宽
+
+    掩码还要求各位置均为 ASCII 字符（每个字符一个字节）。
+    """
+    if np is None or spec.core_type == CORE_EMPTY or isinstance(spec, OrderedSpec):
+        # 按概率排序的候选顺序随前缀变化，逐个生成
+        return False
+    if isinstance(spec, MaskSpec) and not all(charset.isascii() for charset in spec.mask_positions):
+        return False
+    suffixes = _suffix_strings(spec)
+    if not suffixes:
+        return False
+    return len({len(suffix) for suffix in suffixes}) == 1
+
+
+def digit_matrix(start, stop, width):
+    """生成数字 [start, stop) 的定宽 ASCII 矩阵，形状为 (stop - start, width)"""
+    numbers = np.arange(start, stop, dtype=np.int64)
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return (numbers[:, None] // powers % 10 + ord('0')).astype(np.uint8)
+
+
+def charset_matrix(start, stop, charsets):
+    """按混合进制生成掩码组合 [start, stop) 的定宽 ASCII 矩阵，charsets 为各位置的候选字符
+
+    掩码的组合数可能超过 int64，序号拆成 Python 整数 high（不限大小）和相对偏移
+    numbers（不超过块大小）：逐位进位时只有偏移部分按数组计算。
+    """
+    numbers = np.arange(stop - start, dtype=np.int64)
+    high = start
+    rows = np.empty((stop - start, len(charsets)), dtype=np.uint8)
+    for column in range(len(charsets) - 1, -1, -1):
+        table = np.frombuffer(charsets[column].encode('ascii'), dtype=np.uint8)
+        high, low = divmod(high, len(table))
+        numbers, digits = np.divmod(numbers + low, len(table))
+        rows[:, column] = table[digits]
+    return rows
+
+
+def _core_source(spec):
+    """返回 (核心数量, 取第 [a, b) 行核心矩阵的函数)"""
+    if spec.is_date_core():
+        # 日期表本身就是定宽字节串，直接视为矩阵
+        dates = spec.core_positions()[0]
+        table = np.frombuffer(dates.data, dtype=np.uint8).reshape(-1, dates.width)
+        return len(table), lambda a, b: table[a:b]
+
+    width = int(spec.core_type)
+    return 10 ** width, lambda a, b: digit_matrix(a, b, width)
+
+
+def _mask_core_source(charsets):
+    count = 1
+    for charset in charsets:
+        count *= len(charset)
+    return count, lambda a, b: charset_matrix(a, b, charsets)
+
+
+def iter_original_chunks(spec, start, stop, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """按块产生序号 [start, stop) 的原始密码，每块为 (以换行分隔的字节串, 条数)"""
+    suffixes = _suffix_strings(spec)
+    suffix_count = len(suffixes)
+    suffix_width = len(suffixes[0])
+    suffix_matrix = np.frombuffer(b''.join(suffixes), dtype=np.uint8).reshape(suffix_count, suffix_width)
+    if isinstance(spec, MaskSpec):
+        # 增量长度的各段分别生成，每段的核心是掩码前 length 个位置
+        for length, offset, count in spec.segments():
+            lo = max(start, offset)
+            hi = min(stop, offset + count)
+            if lo < hi:
+                core_count, core_rows = _mask_core_source(spec.mask_positions[:length])
+                yield from _iter_chunks(spec.prefix_options, core_count, core_rows, suffix_matrix,
+                                        lo - offset, hi - offset, chunk_rows)
+        return
+    core_count, core_rows = _core_source(spec)
+    yield from _iter_chunks(spec.prefix_options, core_count, core_rows, suffix_matrix, start, stop, chunk_rows)
+
+
+def _iter_chunks(prefix_options, core_count, core_rows, suffix_matrix, start, stop, chunk_rows):
+    """前缀 × 核心 × 后缀 空间内序号 [start, stop) 的分块生成"""
+    suffix_count, suffix_width = suffix_matrix.shape
+
+    # 同一前缀下的候选数：核心 × 后缀
+    block = core_count * suffix_count
+    index = start
+    while index < stop:
+        prefix_index, offset = divmod(index, block)
+        count = min(stop - index, block - offset, chunk_rows)
+        first_core = offset // suffix_count
+        last_core = (offset + count - 1) // suffix_count + 1
+
+        prefix = np.frombuffer(combo_at(prefix_options, prefix_index).encode('utf-8'), dtype=np.uint8)
+        cores = core_rows(first_core, last_core)
+        prefix_width = len(prefix)
+        core_width = cores.shape[1]
+        width = prefix_width + core_width + suffix_width + 1
+
+        rows = np.empty((last_core - first_core, suffix_count, width), dtype=np.uint8)
+        rows[:, :, :prefix_width] = prefix
+        rows[:, :, prefix_width:prefix_width + core_width] = cores[:, None, :]
+        rows[:, :, prefix_width + core_width:width - 1] = suffix_matrix[None, :, :]
+        rows[:, :, width - 1] = NEWLINE
+
+        skip = offset - first_core * suffix_count
+        yield rows.reshape(-1, width)[skip:skip + count].tobytes(), count
+        index += count
+
+
+def self_test():
+    """用逐个生成的结果校验批量生成（含超过 int64 的掩码序号）；不一致时抛出 ValueError"""
+    from password_engine import PasswordSpec, iter_output_chunks
+
+    cases = [
+        (PasswordSpec([["a", "bc"]], "4", [["x", "y"]]), 19990, 20010),
+        (MaskSpec("?a?a?a?a?a?a?a?a?a?a"), 59873693923837890622, 59873693923837890625),
+        (MaskSpec("?l?d?u", min_length=1), 0, 300),
+    ]
+    for spec, start, stop in cases:
+        if not supports(spec):
+            continue
+        expected = ''.join(candidate + '\n' for candidate in spec.iter_range(start, stop)).encode('utf-8')
+        actual = b''.join(data for data, _ in iter_output_chunks(spec, "original", start=start, stop=stop))
+        if actual != expected:
+            raise ValueError(f"批量生成自检失败: {spec.describe()} [{start}, {stop})")
+    return True
+
+
+if __name__ == "__main__":
+    if not is_available():
+        print("未安装 NumPy，使用逐个生成的方式")
+    else:
+        self_test()
+        print("批量生成自检通过")
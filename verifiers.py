@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+密码验证器插件注册表
+
+每种文件格式对应一个验证器插件，接口为：
+    sniff(header, path)            根据文件开头的魔数判断是否为本格式
+    prepare(path) -> state         解析加密文件一次，返回验证所需的状态
+    check_batch(state, candidates) 验证一批候选，返回第一个正确密码的下标，没有时返回 None
+    close(state)                   释放状态
+
+插件通过类属性声明能力：
+    batchable       一次验证大量候选是否有额外收益（如 ZipCrypto 批量快速校验）；
+                    为 False 时说明每个候选的代价主要是 KDF，解密端会使用较小的批次
+    cheap_precheck  是否在完整解密之前有廉价的校验值比较
+
+文件格式按魔数识别，不依赖扩展名；魔数无法区分时（如未加密的 OOXML 也是 ZIP 结构）
+再参考扩展名。新格式或更快的实现只需调用 register_verifier() 注册即可。
+"""
+
+import os
+
+from office_verifier import OfficeVerifier
+from rar_verifier import RarVerifier
+from zip_verifier import ZipVerifier
+
+# 识别格式时读取的文件头长度
+SNIFF_SIZE = 8
+
+# 文件魔数
+ZIP_MAGIC = (b'PK\x03\x04', b'PK\x05\x06')
+RAR_MAGIC = b'Rar!\x1a\x07'
+OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+
+class VerifierPlugin:
+    """验证器插件基类"""
+
+    name = ""
+    description = ""
+    extensions = ()
+    batchable = False
+    cheap_precheck = False
+
+    def sniff(self, header, path):
+        return False
+
+    def prepare(self, path):
+        raise NotImplementedError
+
+    def check_batch(self, state, candidates):
+        raise NotImplementedError
+
+    def close(self, state):
+        state.close()
+
+    def is_batchable(self, state):
+        """具体文件是否适合大批量验证，默认与 batchable 相同"""
+        return self.batchable
+
+    def capabilities(self):
+        return {"batchable": self.batchable, "cheap_precheck": self.cheap_precheck}
+
+
+class ZipVerifierPlugin(VerifierPlugin):
+    name = "zip"
+    description = "ZIP 压缩包"
+    extensions = ('.zip',)
+    batchable = True
+    cheap_precheck = True
+
+    def sniff(self, header, path):
+        return header[:4] in ZIP_MAGIC
+
+    def prepare(self, path):
+        return ZipVerifier(path)
+
+    def is_batchable(self, state):
+        # WinZip AES 每个候选都要计算 PBKDF2，批量验证没有额外收益
+        return not state.is_aes
+
+    def check_batch(self, state, candidates):
+        return state.check_batch(candidates)
+
+
+class RarVerifierPlugin(VerifierPlugin):
+    name = "rar"
+    description = "RAR 压缩包"
+    extensions = ('.rar',)
+    cheap_precheck = True
+
+    def sniff(self, header, path):
+        return header.startswith(RAR_MAGIC)
+
+    def prepare(self, path):
+        return RarVerifier(path)
+
+    def check_batch(self, state, candidates):
+        return state.check_batch(candidates)
+
+
+class OfficeVerifierPlugin(VerifierPlugin):
+    name = "office"
+    description = "Office 文档"
+    extensions = ('.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx')
+    cheap_precheck = True
+
+    def sniff(self, header, path):
+        # 加密的 OOXML 和 97-2003 文档都是 OLE 复合文档；未加密的 OOXML 是 ZIP 结构
+        if header.startswith(OLE_MAGIC):
+            return True
+        return header[:4] in ZIP_MAGIC and os.path.splitext(path)[1].lower() in self.extensions
+
+    def prepare(self, path):
+        return OfficeVerifier(path)
+
+    def check_batch(self, state, candidates):
+        return state.check_batch(candidates)
+
+
+_registry = []
+
+
+def register_verifier(plugin, first=False):
+    """注册验证器插件；first 为 True 时优先于已注册的同格式插件"""
+    if first:
+        _registry.insert(0, plugin)
+    else:
+        _registry.append(plugin)
+    return plugin
+
+
+def registered_verifiers():
+    return list(_registry)
+
+
+def supported_extensions():
+    """所有插件声明的扩展名（用于文件选择对话框和提示信息）"""
+    extensions = []
+    for plugin in _registry:
+        for ext in plugin.extensions:
+            if ext not in extensions:
+                extensions.append(ext)
+    return extensions
+
+
+def detect_verifier(path):
+    """按文件魔数选择验证器插件，无法识别时返回 None
+
+    多个插件都匹配魔数时，优先选择声明了该扩展名的插件。
+    """
+    with open(path, 'rb') as f:
+        header = f.read(SNIFF_SIZE)
+    matches = [plugin for plugin in _registry if plugin.sniff(header, path)]
+    if not matches:
+        return None
+    ext = os.path.splitext(path)[1].lower()
+    for plugin in matches:
+        if ext in plugin.extensions:
+            return plugin
+    return matches[0]
+
+
+register_verifier(OfficeVerifierPlugin())
+register_verifier(ZipVerifierPlugin())
+register_verifier(RarVerifierPlugin())
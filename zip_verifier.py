@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ZIP 密码验证器
+
+压缩包只解析一次：打开 ZipFile、选定目标条目并把它的 12 字节加密头和校验字节缓存在内存中。
+每个候选先用缓存的加密头做快速校验，只有通过快速校验的候选才会完整解压并校验 CRC。
+
+传统 PKWARE 加密（ZipCrypto）的快速校验使用本模块自带的查表 CRC32 密钥编排，按批处理候选，
+并复用相邻候选公共前缀的密钥状态（生成器按字典序输出，相邻候选通常只有末尾几位不同）。
+
+WinZip AES 加密（标准库 zipfile 无法读取）：盐值和 2 字节密码校验值只读取一次，
+候选用 PBKDF2-HMAC-SHA1 派生密钥后先比较校验值，通过的候选再用 HMAC-SHA1 认证码确认。
+"""
+
+import hashlib
+import hmac
+import struct
+import zipfile
+
+# 本地文件头固定部分长度
+LOCAL_HEADER_SIZE = 30
+
+# 传统 PKWARE 加密头长度
+ZIPCRYPTO_HEADER_SIZE = 12
+
+# WinZip AES 加密的压缩方法编号
+AES_COMPRESS_TYPE = 99
+
+# WinZip AES 扩展字段编号、密钥长度（按强度 1/2/3）、迭代次数和认证码长度
+AES_EXTRA_ID = 0x9901
+AES_KEY_LENGTHS = {1: 16, 2: 24, 3: 32}
+AES_PBKDF2_ITERATIONS = 1000
+AES_VERIFIER_SIZE = 2
+AES_AUTH_CODE_SIZE = 10
+
+# 完整校验时每次读取的大小
+CONFIRM_READ_SIZE = 1 << 20
+
+# ZipCrypto 初始密钥
+ZIPCRYPTO_KEY0 = 0x12345678
+ZIPCRYPTO_KEY1 = 0x23456789
+ZIPCRYPTO_KEY2 = 0x34567890
+
+
+def _make_crc_table():
+    table = []
+    for n in range(256):
+        c = n
+        for _ in range(8):
+            c = (c >> 1) ^ 0xEDB88320 if c & 1 else c >> 1
+        table.append(c)
+    return table
+
+
+CRC_TABLE = _make_crc_table()
+
+
+def zipcrypto_filter(passwords, header, check_byte):
+    """ZipCrypto 批量快速校验
+
+    passwords 为字节串列表，返回加密头最后一个字节解密后等于 check_byte 的候选下标列表。
+    相邻候选的公共前缀只计算一次密钥状态。
+    """
+    crc_table = CRC_TABLE
+    header_bytes = header[:ZIPCRYPTO_HEADER_SIZE - 1]
+    last_byte = header[ZIPCRYPTO_HEADER_SIZE - 1]
+
+    survivors = []
+    # states[i] 为处理完前一个候选的前 i 个字节后的 (key0, key1, key2)
+    states = [(ZIPCRYPTO_KEY0, ZIPCRYPTO_KEY1, ZIPCRYPTO_KEY2)]
+    previous = b''
+    for index, password in enumerate(passwords):
+        # 计算与前一个候选的公共前缀长度，复用对应的密钥状态
+        common = 0
+        limit = min(len(password), len(previous))
+        while common < limit and password[common] == previous[common]:
+            common += 1
+        del states[common + 1:]
+        key0, key1, key2 = states[common]
+        for c in password[common:]:
+            key0 = (key0 >> 8) ^ crc_table[(key0 ^ c) & 0xff]
+            key1 = ((key1 + (key0 & 0xff)) * 134775813 + 1) & 0xffffffff
+            key2 = (key2 >> 8) ^ crc_table[(key2 ^ (key1 >> 24)) & 0xff]
+            states.append((key0, key1, key2))
+        previous = password
+
+        # 解密前 11 个加密头字节，只为推进密钥状态
+        for c in header_bytes:
+            temp = key2 | 2
+            c ^= ((temp * (temp ^ 1)) >> 8) & 0xff
+            key0 = (key0 >> 8) ^ crc_table[(key0 ^ c) & 0xff]
+            key1 = ((key1 + (key0 & 0xff)) * 134775813 + 1) & 0xffffffff
+            key2 = (key2 >> 8) ^ crc_table[(key2 ^ (key1 >> 24)) & 0xff]
+
+        temp = key2 | 2
+        if last_byte ^ (((temp * (temp ^ 1)) >> 8) & 0xff) == check_byte:
+            survivors.append(index)
+    return survivors
+
+
+class ZipVerifier:
+    """ZIP 密码验证器：解析一次，缓存目标条目的加密头，逐个验证候选"""
+
+    def __init__(self, zip_file):
+        self.path = zip_file
+        self._zip = zipfile.ZipFile(zip_file, 'r')
+        try:
+            self.info = self._select_target()
+            self.encrypted = self.info is not None and bool(self.info.flag_bits & 0x1)
+            self.is_aes = self.encrypted and self.info.compress_type == AES_COMPRESS_TYPE
+            self.encryption_header = None
+            self.check_byte = None
+            # 目标条目为空时，通过校验的候选还需符合其他加密条目的校验字节
+            self.extra_checks = []
+            if self.is_aes:
+                self._read_aes_header()
+            elif self.encrypted:
+                self.encryption_header = self._read_encryption_header(self.info)
+                self.check_byte = self._expected_check_byte(self.info)
+                if self.info.file_size == 0:
+                    self.extra_checks = self._extra_checks()
+        except Exception:
+            self._zip.close()
+            raise
+
+    def _select_target(self):
+        """选择有数据的最小加密条目作为目标，使完整校验的代价最小
+
+        空条目解压后没有数据和 CRC 可以校验，只在所有加密条目都为空时使用。
+        """
+        entries = [info for info in self._zip.infolist() if not info.is_dir()]
+        if not entries:
+            return None
+        encrypted = [info for info in entries if info.flag_bits & 0x1] or entries
+        with_data = [info for info in encrypted if info.file_size > 0]
+        return min(with_data or encrypted, key=lambda info: info.compress_size)
+
+    def _extra_checks(self):
+        """其他 ZipCrypto 加密条目的 (加密头, 校验字节)"""
+        checks = []
+        for info in self._zip.infolist():
+            if (info is self.info or info.is_dir() or not info.flag_bits & 0x1
+                    or info.compress_type == AES_COMPRESS_TYPE):
+                continue
+            checks.append((self._read_encryption_header(info), self._expected_check_byte(info)))
+        return checks
+
+    def _data_offset(self, info=None):
+        """读取本地文件头，返回条目数据的起始位置"""
+        info = info or self.info
+        fp = self._zip.fp
+        fp.seek(info.header_offset)
+        header = fp.read(LOCAL_HEADER_SIZE)
+        if len(header) != LOCAL_HEADER_SIZE or header[:4] != b'PK\x03\x04':
+            raise zipfile.BadZipFile("本地文件头损坏")
+        name_length, extra_length = struct.unpack('<HH', header[26:30])
+        return info.header_offset + LOCAL_HEADER_SIZE + name_length + extra_length
+
+    def _read_encryption_header(self, info):
+        fp = self._zip.fp
+        fp.seek(self._data_offset(info))
+        header = fp.read(ZIPCRYPTO_HEADER_SIZE)
+        if len(header) != ZIPCRYPTO_HEADER_SIZE:
+            raise zipfile.BadZipFile("加密头不完整")
+        return header
+
+    def _read_aes_header(self):
+        """读取 AES 扩展字段（强度）以及数据开头的盐值和密码校验值"""
+        strength = None
+        extra = self.info.extra
+        pos = 0
+        while pos + 4 <= len(extra):
+            field_id, field_size = struct.unpack('<HH', extra[pos:pos + 4])
+            if field_id == AES_EXTRA_ID and field_size >= 7:
+                strength = extra[pos + 8]
+                break
+            pos += 4 + field_size
+        if strength not in AES_KEY_LENGTHS:
+            raise zipfile.BadZipFile("AES 扩展字段缺失或加密强度无效")
+
+        self.aes_key_length = AES_KEY_LENGTHS[strength]
+        salt_length = self.aes_key_length // 2
+        data_offset = self._data_offset()
+        fp = self._zip.fp
+        fp.seek(data_offset)
+        head = fp.read(salt_length + AES_VERIFIER_SIZE)
+        if len(head) != salt_length + AES_VERIFIER_SIZE:
+            raise zipfile.BadZipFile("AES 加密头不完整")
+        self.aes_salt = head[:salt_length]
+        self.aes_verifier = head[salt_length:]
+
+        # 密文位于盐值/校验值之后、认证码之前
+        self.aes_data_offset = data_offset + len(head)
+        self.aes_data_size = self.info.compress_size - len(head) - AES_AUTH_CODE_SIZE
+        if self.aes_data_size < 0:
+            raise zipfile.BadZipFile("AES 条目长度无效")
+        fp.seek(self.aes_data_offset + self.aes_data_size)
+        self.aes_auth_code = fp.read(AES_AUTH_CODE_SIZE)
+
+    def _aes_derive(self, password_bytes):
+        """派生 加密密钥 + 认证密钥 + 2 字节校验值"""
+        return hashlib.pbkdf2_hmac('sha1', password_bytes, self.aes_salt, AES_PBKDF2_ITERATIONS,
+                                   2 * self.aes_key_length + AES_VERIFIER_SIZE)
+
+    def _aes_confirm(self, derived):
+        """用认证密钥计算密文的 HMAC-SHA1，与存储的 10 字节认证码比较"""
+        auth_key = derived[self.aes_key_length:2 * self.aes_key_length]
+        mac = hmac.new(auth_key, digestmod=hashlib.sha1)
+        fp = self._zip.fp
+        fp.seek(self.aes_data_offset)
+        remaining = self.aes_data_size
+        while remaining > 0:
+            block = fp.read(min(remaining, CONFIRM_READ_SIZE))
+            if not block:
+                return False
+            mac.update(block)
+            remaining -= len(block)
+        return hmac.compare_digest(mac.digest()[:AES_AUTH_CODE_SIZE], self.aes_auth_code)
+
+    def _aes_check(self, password_bytes):
+        derived = self._aes_derive(password_bytes)
+        if derived[-AES_VERIFIER_SIZE:] != self.aes_verifier:
+            return False
+        return self._aes_confirm(derived)
+
+    @staticmethod
+    def _expected_check_byte(info):
+        """加密头最后一个字节应等于 CRC 的最高字节（使用数据描述符时为修改时间的高字节）"""
+        if info.flag_bits & 0x8:
+            return (info._raw_time >> 8) & 0xff
+        return (info.CRC >> 24) & 0xff
+
+    def quick_check(self, password_bytes):
+        """只解密缓存的 12 字节加密头并比较校验字节，错误密码约 255/256 在此被排除"""
+        return bool(zipcrypto_filter([password_bytes], self.encryption_header, self.check_byte))
+
+    def confirm(self, password_bytes):
+        """完整解压目标条目，读到末尾时由 zipfile 校验 CRC
+
+        目标条目为空时没有可校验的数据，改为逐个比较其他加密条目的校验字节。
+        """
+        for header, check_byte in self.extra_checks:
+            if not zipcrypto_filter([password_bytes], header, check_byte):
+                return False
+        try:
+            with self._zip.open(self.info, pwd=password_bytes) as f:
+                while f.read(CONFIRM_READ_SIZE):
+                    pass
+            return True
+        except Exception:
+            # 密码错误时可能表现为 Bad password、解压错误或 CRC 错误
+            return False
+
+    def check(self, password):
+        """验证单个密码"""
+        if self.info is None:
+            return False
+        password_bytes = password.encode('utf-8')
+        if not self.encrypted:
+            return self.confirm(password_bytes)
+        if self.is_aes:
+            return self._aes_check(password_bytes)
+        if not self.quick_check(password_bytes):
+            return False
+        return self.confirm(password_bytes)
+
+    def check_batch(self, passwords):
+        """验证一批密码，返回第一个正确密码的下标，没有时返回 None"""
+        if self.info is None:
+            return None
+        encoded = [password.encode('utf-8') for password in passwords]
+        if not self.encrypted:
+            return 0 if encoded and self.confirm(encoded[0]) else None
+        if self.is_aes:
+            for index, password_bytes in enumerate(encoded):
+                if self._aes_check(password_bytes):
+                    return index
+            return None
+        for index in zipcrypto_filter(encoded, self.encryption_header, self.check_byte):
+            if self.confirm(encoded[index]):
+                return index
+        return None
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()